@@ -0,0 +1,36 @@
+"""Add log_import_chunks table
+
+Revision ID: 3e7d1c9a5f20
+Revises: 9c2f4e6a1b73
+Create Date: 2026-10-18 16:02:37.518442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e7d1c9a5f20'
+down_revision: Union[str, None] = '9c2f4e6a1b73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('log_import_chunks',
+    sa.Column('import_id', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+    sa.Column('chunk', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('inserted', sa.Integer(), nullable=False),
+    sa.Column('errors', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default='now()', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('import_id', 'chunk')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('log_import_chunks')
@@ -0,0 +1,44 @@
+"""Add composite indexes on hot log and workout access paths
+
+Revision ID: 5e0b7c41a9d2
+Revises: d80148f0b385
+Create Date: 2026-10-18 11:03:27.540912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0b7c41a9d2'
+down_revision: Union[str, None] = 'd80148f0b385'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Historique / pagination / stats : WHERE user_id = ? ORDER BY date, id
+    op.create_index('ix_user_exercise_logs_user_id_date', 'user_exercise_logs', ['user_id', 'date', 'id'])
+    # Filtre par exercice + records : reps/weight inclus pour des index-only scans
+    op.create_index(
+        'ix_user_exercise_logs_user_id_exercise_id_date',
+        'user_exercise_logs',
+        ['user_id', 'exercise_id', 'date'],
+        postgresql_include=['reps', 'weight'],
+    )
+    # Logs d'un workout + cascade à la suppression d'un workout
+    op.create_index('ix_user_exercise_logs_workout_id', 'user_exercise_logs', ['workout_id'])
+    # Workout du jour
+    op.create_index('ix_workouts_user_id_day_of_week', 'workouts', ['user_id', 'day_of_week'])
+    # Chargement en lot des exercices d'une page de workouts
+    op.create_index('ix_workout_exercises_workout_id', 'workout_exercises', ['workout_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_workout_exercises_workout_id', table_name='workout_exercises')
+    op.drop_index('ix_workouts_user_id_day_of_week', table_name='workouts')
+    op.drop_index('ix_user_exercise_logs_workout_id', table_name='user_exercise_logs')
+    op.drop_index('ix_user_exercise_logs_user_id_exercise_id_date', table_name='user_exercise_logs')
+    op.drop_index('ix_user_exercise_logs_user_id_date', table_name='user_exercise_logs')
@@ -0,0 +1,37 @@
+"""Add workout_exercises.position
+
+Revision ID: 7b5e2a9d4c81
+Revises: 3e7d1c9a5f20
+Create Date: 2026-10-18 17:41:05.902113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b5e2a9d4c81'
+down_revision: Union[str, None] = '3e7d1c9a5f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('workout_exercises', sa.Column('position', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill : l'ordre d'affichage était celui des id
+    op.execute("""
+        UPDATE workout_exercises we
+        SET position = ranked.position
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY workout_id ORDER BY id) - 1 AS position
+            FROM workout_exercises
+        ) ranked
+        WHERE ranked.id = we.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('workout_exercises', 'position')
@@ -0,0 +1,40 @@
+"""Add users.timezone and indexed user_exercise_logs.training_date
+
+Revision ID: 9c2f4e6a1b73
+Revises: 5e0b7c41a9d2
+Create Date: 2026-10-18 12:21:09.774310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c2f4e6a1b73'
+down_revision: Union[str, None] = '5e0b7c41a9d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('timezone', sa.String(), server_default='UTC', nullable=False))
+    op.add_column('user_exercise_logs', sa.Column('training_date', sa.Date(), nullable=True))
+
+    # Backfill : date est un timestamp UTC naïf, converti dans le fuseau du user
+    op.execute("""
+        UPDATE user_exercise_logs l
+        SET training_date = ((l.date AT TIME ZONE 'UTC') AT TIME ZONE u.timezone)::date
+        FROM users u
+        WHERE u.id = l.user_id
+    """)
+
+    op.alter_column('user_exercise_logs', 'training_date', nullable=False)
+    op.create_index('ix_user_exercise_logs_user_id_training_date', 'user_exercise_logs', ['user_id', 'training_date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_exercise_logs_user_id_training_date', table_name='user_exercise_logs')
+    op.drop_column('user_exercise_logs', 'training_date')
+    op.drop_column('users', 'timezone')
@@ -0,0 +1,49 @@
+"""Add shared workout templates
+
+Revision ID: a4c8e1f6b2d7
+Revises: 7b5e2a9d4c81
+Create Date: 2026-10-18 18:26:44.120937
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e1f6b2d7'
+down_revision: Union[str, None] = '7b5e2a9d4c81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Les users existants gardent leurs copies des workouts de base : pas de templates pour eux
+    op.add_column('users', sa.Column('uses_templates', sa.Boolean(), server_default='false', nullable=False))
+    op.alter_column('workouts', 'user_id', existing_type=sa.Integer(), nullable=True)
+    op.add_column('workouts', sa.Column('template_key', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('workouts', sa.Column('template_id', sa.Integer(), nullable=True))
+    op.create_unique_constraint('workouts_template_key_key', 'workouts', ['template_key'])
+    op.create_foreign_key('workouts_template_id_fkey', 'workouts', 'workouts', ['template_id'], ['id'], ondelete='SET NULL')
+    op.create_table('hidden_workout_templates',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('template_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['template_id'], ['workouts.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'template_id')
+    )
+    # Les templates eux-mêmes sont créés par le seed de démarrage (app/database/startup.py),
+    # jamais sur un chemin de lecture
+
+
+def downgrade() -> None:
+    op.drop_table('hidden_workout_templates')
+    op.drop_constraint('workouts_template_id_fkey', 'workouts', type_='foreignkey')
+    op.drop_constraint('workouts_template_key_key', 'workouts', type_='unique')
+    op.execute("DELETE FROM workouts WHERE user_id IS NULL")
+    op.drop_column('workouts', 'template_id')
+    op.drop_column('workouts', 'template_key')
+    op.alter_column('workouts', 'user_id', existing_type=sa.Integer(), nullable=False)
+    op.drop_column('users', 'uses_templates')
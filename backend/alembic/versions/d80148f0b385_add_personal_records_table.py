@@ -0,0 +1,41 @@
+"""Add personal_records table
+
+Revision ID: d80148f0b385
+Revises: b448a8abf505
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd80148f0b385'
+down_revision: Union[str, None] = 'b448a8abf505'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('personal_records',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('exercise_id', sa.Integer(), nullable=False),
+    sa.Column('reps', sa.Integer(), nullable=False),
+    sa.Column('weight', sa.Float(), nullable=False),
+    sa.Column('log_id', sa.Integer(), nullable=True),
+    sa.Column('achieved_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default='now()', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['exercise_id'], ['exercises.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['log_id'], ['user_exercise_logs.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'exercise_id', 'reps')
+    )
+    # Le backfill se fait avec scripts/rebuild_personal_records.py
+
+
+def downgrade() -> None:
+    op.drop_table('personal_records')
@@ -1,26 +1,86 @@
-from sqlalchemy.orm import Session
-from datetime import date, timedelta
-from app.crud.workouts import get_workout_for_day
-from app.crud.user_exercise_log import get_logs_for_date
+from sqlalchemy.orm import Session, aliased
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import Date, and_, cast, exists, extract, func, select
+from app.crud.workouts import get_workout, get_workout_async
+from app.models.base import User, UserExerciseLog, Workout, WorkoutExercise
 from app.schemas.dashboard import DashboardData
+from app.schemas.workouts import WorkoutSummary
 
-def get_dashboard_data(user_id: int, session: Session) -> DashboardData:
-    today = date.today()
-    yesterday = today - timedelta(days=1)
+def _dashboard_query(user_id: int):
+    """
+    Une seule requête calcule, dans le fuseau du user : le workout du jour (résumé)
+    et si le workout d'hier a été "skip" (EXISTS plan ET NOT EXISTS log).
+    En mode complet, le détail du workout est ensuite chargé par le loader en lot.
+    """
+    local_today = cast(func.timezone(User.timezone, func.now()), Date)
+    # Veille calendaire (date - 1) : now() - 1 jour converti en local tombe sur le mauvais
+    # jour quand un changement d'heure fait des journées de 23 ou 25 heures
+    local_yesterday = local_today - 1
 
-    # 1. Récupérer l'entraînement du jour
-    todays_workout = get_workout_for_day(user_id=user_id, day_of_week=today.isoweekday(), session=session)
+    todays_workout = aliased(Workout)
+    exercise_count = (
+        select(func.count(WorkoutExercise.id))
+        .where(WorkoutExercise.workout_id == todays_workout.id)
+        .scalar_subquery()
+    )
+    yesterday_planned = exists().where(
+        Workout.user_id == User.id,
+        Workout.day_of_week == extract("isodow", local_yesterday),
+    )
+    yesterday_logged = exists().where(
+        UserExerciseLog.user_id == User.id,
+        UserExerciseLog.training_date == local_yesterday,
+    )
 
-    # 2. Vérifier si l'entraînement d'hier a été "skip"
-    yesterday_skipped = False
-    yesterdays_plan = get_workout_for_day(user_id=user_id, day_of_week=yesterday.isoweekday(), session=session)
-    
-    if yesterdays_plan:
-        yesterdays_logs = get_logs_for_date(user_id=user_id, target_date=yesterday, session=session)
-        if not yesterdays_logs:
-            yesterday_skipped = True
+    return (
+        select(
+            todays_workout.id,
+            todays_workout.name,
+            todays_workout.day_of_week,
+            exercise_count.label("exercise_count"),
+            and_(yesterday_planned, ~yesterday_logged).label("yesterday_skipped"),
+        )
+        .select_from(User)
+        .outerjoin(
+            todays_workout,
+            and_(
+                todays_workout.user_id == User.id,
+                todays_workout.day_of_week == extract("isodow", local_today),
+            ),
+        )
+        .where(User.id == user_id)
+        .order_by(todays_workout.id)
+        .limit(1)
+    )
 
+def _summary(row) -> WorkoutSummary:
+    return WorkoutSummary(
+        id=row["id"],
+        name=row["name"],
+        day_of_week=row["day_of_week"],
+        exercise_count=row["exercise_count"],
+    )
+
+def get_dashboard_data(user_id: int, session: Session, summary: bool = False) -> DashboardData:
+    row = session.execute(_dashboard_query(user_id)).mappings().first()
+
+    if row is None or row["id"] is None:
+        return DashboardData(yesterday_skipped=bool(row and row["yesterday_skipped"]))
+
+    todays = _summary(row) if summary else get_workout(row["id"], session)
+    return DashboardData(
+        todays_workout=todays,
+        yesterday_skipped=row["yesterday_skipped"]
+    )
+
+async def get_dashboard_data_async(user_id: int, session: AsyncSession, summary: bool = False) -> DashboardData:
+    row = (await session.execute(_dashboard_query(user_id))).mappings().first()
+
+    if row is None or row["id"] is None:
+        return DashboardData(yesterday_skipped=bool(row and row["yesterday_skipped"]))
+
+    todays = _summary(row) if summary else await get_workout_async(row["id"], session)
     return DashboardData(
-        todays_workout=todays_workout,
-        yesterday_skipped=yesterday_skipped
+        todays_workout=todays,
+        yesterday_skipped=row["yesterday_skipped"]
     )
\ No newline at end of file
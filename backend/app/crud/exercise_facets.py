@@ -0,0 +1,66 @@
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from app.schemas.exercises import ExerciseOut
+
+# Filtrage à facettes du catalogue : pour chaque facette, un bitset (int Python) par
+# valeur, où le bit i correspond au i-ème exercice du snapshot. Un filtre se résume
+# à des OR (valeurs d'une même facette) et des AND (entre facettes), sans requête SQL.
+
+FACETS = ("muscle_group", "equipement", "difficulty", "is_cardio")
+
+
+def _key(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return str(value).lower()
+    return str(value)
+
+
+class FacetIndex:
+    def __init__(self, exercises: Sequence[ExerciseOut]):
+        self._exercises = tuple(exercises)
+        self._all = (1 << len(self._exercises)) - 1
+        bitsets: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+        for position, exercise in enumerate(self._exercises):
+            for facet in FACETS:
+                value = _key(getattr(exercise, facet))
+                if value is not None:
+                    bitsets[facet][value] = bitsets[facet].get(value, 0) | (1 << position)
+        self._bitsets: Mapping[str, Mapping[str, int]] = MappingProxyType(
+            {facet: MappingProxyType(values) for facet, values in bitsets.items()}
+        )
+
+    def _facet_mask(self, facet: str, values: Iterable[str]) -> int:
+        mask = 0
+        for value in values:
+            mask |= self._bitsets[facet].get(value, 0)
+        return mask
+
+    def filter(
+        self, selected: Mapping[str, Sequence[str]]
+    ) -> Tuple[List[ExerciseOut], Dict[str, Dict[str, int]]]:
+        """
+        Retourne les exercices correspondant à tous les filtres et, pour chaque facette,
+        le nombre d'exercices par valeur en tenant compte des filtres des autres
+        facettes uniquement (on peut ainsi élargir une sélection multi-valeurs).
+        """
+        masks = {facet: self._facet_mask(facet, values) for facet, values in selected.items() if values}
+
+        matched = self._all
+        for mask in masks.values():
+            matched &= mask
+
+        counts: Dict[str, Dict[str, int]] = {}
+        for facet in FACETS:
+            others = self._all
+            for other, mask in masks.items():
+                if other != facet:
+                    others &= mask
+            counts[facet] = {
+                value: (bits & others).bit_count()
+                for value, bits in sorted(self._bitsets[facet].items())
+            }
+
+        exercises = [e for position, e in enumerate(self._exercises) if matched >> position & 1]
+        return exercises, counts
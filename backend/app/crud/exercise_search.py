@@ -0,0 +1,68 @@
+import unicodedata
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Tuple
+
+# Recherche floue sur les noms d'exercices : index trigrammes en mémoire, construit
+# avec le snapshot du catalogue. Même principe que pg_trgm (mots bordés d'espaces),
+# sans accents ni casse, et tolérant aux fautes de frappe.
+
+MIN_SCORE = 0.3
+
+
+def normalize(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join("".join(c if c.isalnum() else " " for c in stripped.lower()).split())
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    grams = set()
+    for word in normalize(text).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+class TrigramIndex:
+    def __init__(self, names: Iterable[Tuple[int, str]]):
+        postings: Dict[str, List[int]] = {}
+        self._names: Dict[int, str] = {}
+        self._grams: Dict[int, FrozenSet[str]] = {}
+        for item_id, name in names:
+            self._names[item_id] = normalize(name)
+            self._grams[item_id] = trigrams(name)
+            for gram in self._grams[item_id]:
+                postings.setdefault(gram, []).append(item_id)
+        self._postings: Mapping[str, Tuple[int, ...]] = MappingProxyType(
+            {gram: tuple(ids) for gram, ids in postings.items()}
+        )
+
+    def search(self, query: str, limit: int = 20) -> List[int]:
+        """
+        Ids classés par pertinence : part des trigrammes de la requête présents dans
+        le nom (≈ word_similarity de pg_trgm), bonus si la requête est une sous-chaîne
+        (préfixe en tête), puis similarité globale pour départager.
+        """
+        query_norm = normalize(query)
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        shared: Dict[int, int] = {}
+        for gram in query_grams:
+            for item_id in self._postings.get(gram, ()):
+                shared[item_id] = shared.get(item_id, 0) + 1
+
+        scored = []
+        for item_id, count in shared.items():
+            name = self._names[item_id]
+            coverage = count / len(query_grams)
+            if query_norm in name:
+                coverage += 1.0 if name.startswith(query_norm) else 0.5
+            elif coverage < MIN_SCORE:
+                continue
+            jaccard = count / (len(query_grams) + len(self._grams[item_id]) - count)
+            scored.append((-coverage, -jaccard, name, item_id))
+
+        scored.sort()
+        return [item_id for *_, item_id in scored[:limit]]
@@ -1,10 +1,121 @@
-from typing import List, Optional
+from typing import Dict, List, Mapping, Optional, Tuple
+from dataclasses import dataclass
+from types import MappingProxyType
+import bisect
+import hashlib
+import threading
+import time
 from sqlmodel import select
-from sqlalchemy import func  
+from sqlalchemy import BigInteger, String, cast, func  
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from app.database.db import get_session
-from app.models.base import Exercise
+from app.database.cache import bump_version, get_version
+from app.models.base import AppState, Exercise
 from app.schemas.exercises import ExerciseCreate, ExerciseUpdate, ExerciseOut
+from app.crud.exercise_search import TrigramIndex
+from app.crud.exercise_facets import FacetIndex
+from app.crud.pagination import decode_cursor
+
+# --- Snapshot en mémoire du catalogue ---
+# Le catalogue (seed_exercises.sql) ne change quasiment jamais : on le charge une fois,
+# on précalcule les index, et on ne le recharge que quand sa version change.
+
+VERSION_CHECK_SECONDS = 1.0  # fréquence max de lecture de la version partagée (Redis ou base)
+CATALOG_VERSION_KEY = "catalog_version"  # ligne app_state, repli sans backend de cache
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    version: str
+    etag: str
+    exercises: Tuple[ExerciseOut, ...]
+    by_id: Mapping[int, ExerciseOut]
+    by_name: Mapping[str, int]
+    by_muscle_group: Mapping[str, Tuple[ExerciseOut, ...]]
+    cardio: Tuple[ExerciseOut, ...]
+    search_index: TrigramIndex
+    facet_index: FacetIndex
+
+_snapshot: Optional[CatalogSnapshot] = None
+_snapshot_lock = threading.Lock()
+_local_version = 0
+_shared_version: Optional[str] = None
+_shared_checked_at = 0.0
+
+def catalog_version_bump():
+    """
+    Incrémente la version du catalogue en base (app_state). À exécuter dans la transaction
+    de l'écriture : c'est la version partagée entre workers quand CACHE_BACKEND=none.
+    """
+    return (
+        pg_insert(AppState)
+        .values(key=CATALOG_VERSION_KEY, value="1", updated_at=func.now())
+        .on_conflict_do_update(
+            index_elements=["key"],
+            set_={"value": cast(cast(AppState.value, BigInteger) + 1, String), "updated_at": func.now()},
+        )
+    )
+
+def _db_version(session: Session) -> str:
+    value = session.exec(select(AppState.value).where(AppState.key == CATALOG_VERSION_KEY)).first()
+    return f"db{value or 0}"
+
+def _catalog_version(session: Session) -> str:
+    # Version locale (écritures de ce process) + version partagée (écritures des autres
+    # workers) relue au plus une fois par seconde : celle du backend de cache s'il y en a un,
+    # sinon celle de la base, pour que les workers gunicorn voient les écritures des autres
+    global _shared_version, _shared_checked_at
+    now = time.monotonic()
+    if now - _shared_checked_at >= VERSION_CHECK_SECONDS:
+        shared = get_version("catalog")
+        _shared_version = shared if shared is not None else _db_version(session)
+        _shared_checked_at = now
+    return f"{_local_version}:{_shared_version}"
+
+def _build_snapshot(version: str, session: Session) -> CatalogSnapshot:
+    exercises = tuple(
+        ExerciseOut.model_validate(e)
+        for e in session.exec(select(Exercise).order_by(Exercise.id)).all()
+    )
+    by_muscle: Dict[str, List[ExerciseOut]] = {}
+    for e in exercises:
+        if e.muscle_group:
+            by_muscle.setdefault(e.muscle_group, []).append(e)
+
+    digest = hashlib.sha1()
+    for e in exercises:
+        digest.update(e.model_dump_json().encode())
+
+    return CatalogSnapshot(
+        version=version,
+        etag=digest.hexdigest(),
+        exercises=exercises,
+        by_id=MappingProxyType({e.id: e for e in exercises}),
+        by_name=MappingProxyType({e.name: e.id for e in exercises}),
+        by_muscle_group=MappingProxyType({k: tuple(v) for k, v in by_muscle.items()}),
+        cardio=tuple(e for e in exercises if e.is_cardio),
+        search_index=TrigramIndex((e.id, e.name) for e in exercises),
+        facet_index=FacetIndex(exercises),
+    )
+
+def get_catalog(session: Session) -> CatalogSnapshot:
+    global _snapshot
+    version = _catalog_version(session)
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    with _snapshot_lock:
+        if _snapshot is None or _snapshot.version != version:
+            # La version est lue avant le chargement : une écriture concurrente
+            # fera simplement reconstruire le snapshot au prochain appel
+            _snapshot = _build_snapshot(version, session)
+        return _snapshot
+
+def invalidate_catalog() -> None:
+    global _local_version, _shared_checked_at
+    _local_version += 1
+    _shared_checked_at = 0.0
+    bump_version("catalog")
 
 def create_exercise(exercise_in: ExerciseCreate, session: Session) -> ExerciseOut:
 
@@ -21,19 +132,23 @@ def create_exercise(exercise_in: ExerciseCreate, session: Session) -> ExerciseOu
         is_cardio=exercise_in.is_cardio
     )
     session.add(db_exercise)
+    session.execute(catalog_version_bump())
     session.commit()
     session.refresh(db_exercise)
+    invalidate_catalog()
     return ExerciseOut.model_validate(db_exercise)
 
 def get_exercise(exercise_id: int, session: Session) -> Optional[ExerciseOut]:
-    exercise = session.get(Exercise, exercise_id)
-    if exercise:
-        return ExerciseOut.model_validate(exercise)
-    return None
+    return get_catalog(session).by_id.get(exercise_id)
 
-def get_exercises(session: Session, offset: int = 0, limit: int = 100 ) -> List[ExerciseOut]:
-    exercises = session.exec(select(Exercise).offset(offset).limit(limit)).all()
-    return [ExerciseOut.model_validate(e) for e in exercises]
+def get_exercises(session: Session, offset: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[ExerciseOut]:
+    catalog = get_catalog(session)
+    start = 0
+    if cursor:
+        # Le snapshot est trié par id : le curseur se résout par dichotomie
+        (last_id,) = decode_cursor(cursor, int)
+        start = bisect.bisect_right(catalog.exercises, last_id, key=lambda e: e.id)
+    return list(catalog.exercises[start + offset:start + offset + limit])
 
 def update_exercise(exercise_id: int, exercise_update: ExerciseUpdate, session: Session) -> Optional[ExerciseOut]:
     exercise = session.get(Exercise, exercise_id)
@@ -43,8 +158,10 @@ def update_exercise(exercise_id: int, exercise_update: ExerciseUpdate, session:
     for field, value in update_data.items():
         setattr(exercise, field, value)
     session.add(exercise)
+    session.execute(catalog_version_bump())
     session.commit()
     session.refresh(exercise)
+    invalidate_catalog()
     return ExerciseOut.model_validate(exercise)
 
 def delete_exercise(exercise_id: int, session: Session) -> bool:
@@ -52,24 +169,19 @@ def delete_exercise(exercise_id: int, session: Session) -> bool:
     if not exercise:
         return False
     session.delete(exercise)
+    session.execute(catalog_version_bump())
     session.commit()
+    invalidate_catalog()
     return True
 
 
-def get_exercise_by_name(name: str, session: Session) -> List[ExerciseOut]:
-    exercises = session.exec(
-        select(Exercise).where(func.unaccent(Exercise.name).ilike(f"%{name}%"))  
-    ).all()
-    return [ExerciseOut.from_orm(e) for e in exercises]
+def get_exercise_by_name(name: str, session: Session, limit: int = 20) -> List[ExerciseOut]:
+    # Recherche floue et classée sur l'index trigrammes du snapshot : aucune requête SQL
+    catalog = get_catalog(session)
+    return [catalog.by_id[i] for i in catalog.search_index.search(name, limit)]
 
 def get_exercises_by_muscle_group(muscle_group: str, session: Session) -> List[ExerciseOut]:
-    exercises = session.exec(
-        select(Exercise).where(Exercise.muscle_group == muscle_group)  
-    ).all()
-    return [ExerciseOut.model_validate(e) for e in exercises]
+    return list(get_catalog(session).by_muscle_group.get(muscle_group, ()))
 
 def get_cardio_exercises(session: Session) -> List[ExerciseOut]:
-    exercises = session.exec(
-        select(Exercise).where(Exercise.is_cardio == True)  
-    ).all()
-    return [ExerciseOut.model_validate(e) for e in exercises]
\ No newline at end of file
+    return list(get_catalog(session).cardio)
\ No newline at end of file
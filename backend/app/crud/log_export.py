@@ -0,0 +1,47 @@
+import csv
+import io
+from typing import Iterator
+from sqlmodel import Session
+from app.database.db import engine
+from app.crud.user_exercise_log import iter_user_exercise_log_batches
+from app.schemas.user_exercise_log import UserExerciseLogFlat
+
+# Export de tout l'historique d'un user, ligne par ligne : curseur serveur (yield_per) côté
+# Postgres et un morceau de réponse par lot, la mémoire ne dépend pas du nombre de séries.
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+EXPORT_BATCH_SIZE = 1000
+CSV_COLUMNS = list(UserExerciseLogFlat.model_fields)
+
+
+def _ndjson(batch) -> bytes:
+    return "".join(
+        UserExerciseLogFlat.model_validate(dict(row)).model_dump_json() + "\n" for row in batch
+    ).encode()
+
+
+def _csv(batch, with_header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if with_header:
+        writer.writerow(CSV_COLUMNS)
+    for row in batch:
+        writer.writerow(row[column] for column in CSV_COLUMNS)
+    return buffer.getvalue().encode()
+
+
+def export_user_logs(user_id: int, fmt: str, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """
+    Générateur de la réponse. Il ouvre sa propre session : celle de la dépendance
+    get_session est déjà fermée quand la StreamingResponse commence à être envoyée.
+    """
+    with Session(engine) as session:
+        first = True
+        for batch in iter_user_exercise_log_batches(session, user_id, batch_size):
+            yield _csv(batch, first) if fmt == "csv" else _ndjson(batch)
+            first = False
+        if first and fmt == "csv":
+            yield _csv([], True)
@@ -0,0 +1,190 @@
+import csv
+import io
+from datetime import timezone
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from pydantic import ValidationError
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.database.cache import bump_version
+from app.models.base import LogImportChunk
+from app.crud.exercises import get_catalog
+from app.crud.exercise_search import normalize
+from app.crud.personal_records import record_logs
+from app.crud.user import get_user_timezone, to_training_date
+from app.schemas.log_import import LogImportRow, LogImportError, LogImportResult, LogImportStatus
+
+# Import en masse de séries : les lignes valides d'un morceau sont chargées par COPY dans
+# une table temporaire, puis insérées en une seule requête INSERT ... SELECT. Chaque morceau
+# est marqué dans log_import_chunks dans la même transaction : rejouer un import ne
+# recharge que les morceaux absents.
+
+IMPORT_FORMATS = ("csv", "ndjson")
+IMPORT_MAX_ROWS = 10_000  # par morceau
+IMPORT_CHUNK_SIZE = 5_000
+
+STAGING_COLUMNS = (
+    "line", "exercise_id", "date", "training_date", "set_number", "reps", "weight",
+    "rest_seconds", "duration_seconds", "distance_m", "volume",
+)
+LOG_COLUMNS = STAGING_COLUMNS[1:]
+
+_CREATE_STAGING = """
+CREATE TEMP TABLE log_import_staging (
+    line integer,
+    exercise_id integer,
+    date timestamp,
+    training_date date,
+    set_number integer,
+    reps integer,
+    weight double precision,
+    rest_seconds integer,
+    duration_seconds integer,
+    distance_m double precision,
+    volume double precision
+) ON COMMIT DROP
+"""
+
+_INSERT_FROM_STAGING = f"""
+INSERT INTO user_exercise_logs (user_id, {", ".join(LOG_COLUMNS)})
+SELECT :user_id, {", ".join(LOG_COLUMNS)}
+FROM log_import_staging
+ORDER BY line
+RETURNING id, user_id, exercise_id, date, reps, weight
+"""
+
+Record = Tuple[int, Union[dict, str]]  # (numéro de ligne du fichier, ligne CSV ou NDJSON brute)
+
+
+def read_records(lines: Iterable[str], fmt: str) -> Iterator[Record]:
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Invalid format: {fmt}. Allowed: {', '.join(IMPORT_FORMATS)}")
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            # Cellule vide = valeur absente
+            yield reader.line_num, {k: v for k, v in row.items() if k and v not in ("", None)}
+    else:
+        for number, line in enumerate(lines, start=1):
+            if line.strip():
+                yield number, line
+
+
+def _error_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, e['loc']))}: {e['msg']}" if e["loc"] else e["msg"]
+        for e in exc.errors()
+    )
+
+
+def _exercise_lookup(session: Session):
+    catalog = get_catalog(session)
+    by_name = {normalize(name): exercise_id for name, exercise_id in catalog.by_name.items()}
+
+    def lookup(row: LogImportRow) -> Optional[int]:
+        if row.exercise_id is not None:
+            return row.exercise_id if row.exercise_id in catalog.by_id else None
+        return catalog.by_name.get(row.exercise) or by_name.get(normalize(row.exercise))
+    return lookup
+
+
+def _validate(session: Session, user_id: int, records: Sequence[Record]) -> Tuple[List[tuple], List[LogImportError]]:
+    lookup = _exercise_lookup(session)
+    tz = get_user_timezone(session, user_id)
+    rows, errors = [], []
+    for line, record in records:
+        try:
+            if isinstance(record, str):
+                row = LogImportRow.model_validate_json(record)
+            else:
+                row = LogImportRow.model_validate(record)
+        except ValidationError as e:
+            errors.append(LogImportError(line=line, error=_error_message(e)))
+            continue
+        exercise_id = lookup(row)
+        if exercise_id is None:
+            errors.append(LogImportError(line=line, error=f"Exercise not found: {row.exercise_id or row.exercise}"))
+            continue
+        moment = row.date
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+        rows.append((
+            line, exercise_id, moment, to_training_date(moment, tz), row.set_number, row.reps,
+            row.weight, row.rest_seconds, row.duration_seconds, row.distance_m,
+            row.volume if row.volume is not None else row.reps * (row.weight or 0),
+        ))
+    return rows, errors
+
+
+def _copy_rows(session: Session, rows: List[tuple]) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow("" if v is None else v.isoformat() if hasattr(v, "isoformat") else v for v in row)
+    buffer.seek(0)
+    session.execute(text(_CREATE_STAGING))
+    cursor = session.connection().connection.cursor()  # curseur psycopg2 de la transaction en cours
+    try:
+        cursor.copy_expert(
+            f"COPY log_import_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def import_log_chunk(session: Session, user_id: int, import_id: str, chunk: int, records: Sequence[Record]) -> LogImportResult:
+    """
+    Importe un morceau de lignes pour un user. Les lignes invalides sont rapportées
+    (numéro de ligne + message) sans bloquer les autres. Un morceau déjà importé
+    n'est pas rechargé.
+    """
+    if len(records) > IMPORT_MAX_ROWS:
+        raise ValueError(f"Too many rows in chunk: {len(records)} (max {IMPORT_MAX_ROWS})")
+    owner = session.execute(
+        select(LogImportChunk.user_id).where(LogImportChunk.import_id == import_id).limit(1)
+    ).scalar_one_or_none()
+    if owner is not None and owner != user_id:
+        raise ValueError("Import id already used")
+
+    rows, errors = _validate(session, user_id, records)
+
+    try:
+        # Le marqueur est posé en premier : un import concurrent du même morceau attend
+        # sur la clé primaire puis ne fait rien
+        marked = session.execute(
+            pg_insert(LogImportChunk)
+            .values(import_id=import_id, chunk=chunk, user_id=user_id, inserted=len(rows), errors=len(errors))
+            .on_conflict_do_nothing()
+            .returning(LogImportChunk.chunk)
+        ).scalar_one_or_none()
+        if marked is None:
+            session.rollback()
+            return LogImportResult(import_id=import_id, chunk=chunk, inserted=0, skipped=True)
+        if rows:
+            _copy_rows(session, rows)
+            created = session.execute(text(_INSERT_FROM_STAGING), {"user_id": user_id}).mappings().all()
+            record_logs(session, [dict(r) for r in created])
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    if rows:
+        bump_version("user", user_id)
+    return LogImportResult(import_id=import_id, chunk=chunk, inserted=len(rows), errors=errors)
+
+
+def get_import_status(session: Session, user_id: int, import_id: str) -> Optional[LogImportStatus]:
+    chunks = session.execute(
+        select(LogImportChunk)
+        .where(LogImportChunk.import_id == import_id, LogImportChunk.user_id == user_id)
+        .order_by(LogImportChunk.chunk)
+    ).scalars().all()
+    if not chunks:
+        return None
+    return LogImportStatus(
+        import_id=import_id,
+        chunks=[c.chunk for c in chunks],
+        inserted=sum(c.inserted for c in chunks),
+        errors=sum(c.errors for c in chunks),
+    )
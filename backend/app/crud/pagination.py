@@ -0,0 +1,32 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence, Tuple
+
+# Pagination par curseur (keyset) : le curseur opaque encode la clé de tri du dernier
+# élément de la page, la page suivante filtre "après cette clé" au lieu d'un OFFSET,
+# ce qui reste en temps constant quelle que soit la profondeur.
+
+
+def encode_cursor(*values: Any) -> str:
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: Callable[[Any], Any]) -> Tuple[Any, ...]:
+    """Décode un curseur et convertit chaque valeur (int, datetime.fromisoformat...)."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError
+        return tuple(convert(value) for convert, value in zip(types, values))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def next_cursor(items: Sequence[Any], limit: int, key: Callable[[Any], Tuple[Any, ...]]) -> Optional[str]:
+    # Page pleine : il peut y avoir une suite (au pire, la page suivante est vide)
+    if limit <= 0 or len(items) < limit:
+        return None
+    return encode_cursor(*key(items[-1]))
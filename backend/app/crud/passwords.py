@@ -0,0 +1,112 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+import anyio
+from passlib.context import CryptContext
+from app.database.config import settings
+
+# Hachage argon2 hors des threads de requête : un pool de process borné exécute
+# hash/verify, et au-delà de HASH_MAX_PENDING opérations en cours on refuse tout de
+# suite (503) plutôt que de laisser une rafale de logins bloquer tous les threads.
+
+
+class HashingBusyError(Exception):
+    """Le pool de hachage est saturé : la requête doit être rejetée (503)."""
+
+
+@lru_cache(maxsize=None)
+def _context(time_cost: int, memory_cost: int, parallelism: int) -> CryptContext:
+    # Mis en cache par process (y compris dans les workers du pool)
+    return CryptContext(
+        schemes=["argon2"],
+        deprecated="auto",
+        argon2__rounds=time_cost,
+        argon2__memory_cost=memory_cost,
+        argon2__parallelism=parallelism,
+    )
+
+
+def _params() -> Tuple[int, int, int]:
+    return settings.ARGON2_TIME_COST, settings.ARGON2_MEMORY_COST, settings.ARGON2_PARALLELISM
+
+
+pwd_context = _context(*_params())
+
+
+def _hash(password: str, params: Tuple[int, int, int]) -> str:
+    return _context(*params).hash(password)
+
+
+def _verify_and_update(password: str, hashed: str, params: Tuple[int, int, int]) -> Tuple[bool, Optional[str]]:
+    # Le nouveau hash n'est renvoyé que si les paramètres argon2 ont changé (needs_update)
+    return _context(*params).verify_and_update(password, hashed)
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(settings.HASH_MAX_PENDING, 1))
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # spawn : pas de fork d'un process uvicorn multi-threadé
+                _executor = ProcessPoolExecutor(
+                    max_workers=settings.HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _executor
+
+
+def _submit(fn, *args) -> Future:
+    if not _slots.acquire(blocking=False):
+        raise HashingBusyError("Password hashing is saturated, retry later")
+    try:
+        future = _get_executor().submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+def _run(fn, *args):
+    if settings.HASH_WORKERS <= 0:
+        return fn(*args)  # mode inline (dev, scripts)
+    return _submit(fn, *args).result()
+
+
+async def _run_async(fn, *args):
+    if settings.HASH_WORKERS <= 0:
+        # Inline mais pas sur la boucle : argon2 la bloquerait pour toutes les requêtes
+        return await anyio.to_thread.run_sync(fn, *args)
+    return await asyncio.wrap_future(_submit(fn, *args))
+
+
+def hash_password(password: str) -> str:
+    return _run(_hash, password, _params())
+
+
+def verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return _run(_verify_and_update, password, hashed, _params())
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_async(_hash, password, _params())
+
+
+async def verify_and_update_async(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return await _run_async(_verify_and_update, password, hashed, _params())
+
+
+def shutdown() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
@@ -0,0 +1,116 @@
+from typing import Iterable, List, Optional
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.models.base import PersonalRecord, Exercise
+from app.schemas.personal_records import PersonalRecordOut
+
+# Paliers suivis : meilleure charge soulevée pour au moins 1, 5 et 10 reps
+PR_REP_TARGETS = (1, 5, 10)
+
+_RECOMPUTE_SQL = """
+INSERT INTO personal_records (user_id, exercise_id, reps, weight, log_id, achieved_at)
+SELECT DISTINCT ON (l.user_id, l.exercise_id, t.reps)
+       l.user_id, l.exercise_id, t.reps, l.weight, l.id, l.date
+FROM user_exercise_logs l
+JOIN unnest(CAST(:targets AS integer[])) AS t(reps) ON l.reps >= t.reps
+WHERE l.weight > 0 {filters}
+ORDER BY l.user_id, l.exercise_id, t.reps, l.weight DESC, l.date ASC
+"""
+
+
+def record_logs(session: Session, logs: Iterable) -> None:
+    """
+    Met à jour les records à partir de logs fraîchement insérés (ORM ou mappings).
+    Un seul upsert, qui ne remplace un record que si la nouvelle charge est supérieure.
+    Ne commit pas : à appeler dans la transaction de l'écriture.
+    """
+    best = {}
+    for log in logs:
+        get = log.get if isinstance(log, dict) else lambda k: getattr(log, k)
+        weight, reps = get("weight"), get("reps")
+        if not weight or weight <= 0 or not reps:
+            continue
+        for target in PR_REP_TARGETS:
+            if reps < target:
+                break
+            key = (get("user_id"), get("exercise_id"), target)
+            if key not in best or weight > best[key]["weight"]:
+                best[key] = {
+                    "user_id": key[0],
+                    "exercise_id": key[1],
+                    "reps": target,
+                    "weight": weight,
+                    "log_id": get("id"),
+                    "achieved_at": get("date"),
+                }
+    if not best:
+        return
+
+    stmt = pg_insert(PersonalRecord).values(list(best.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "exercise_id", "reps"],
+        set_={
+            "weight": stmt.excluded.weight,
+            "log_id": stmt.excluded.log_id,
+            "achieved_at": stmt.excluded.achieved_at,
+            "updated_at": func.now(),  # onupdate n'est pas appliqué à ON CONFLICT DO UPDATE
+        },
+        where=PersonalRecord.weight < stmt.excluded.weight,
+    )
+    session.execute(stmt)
+
+
+def refresh_exercise_records(session: Session, user_id: int, exercise_id: int) -> None:
+    """
+    Recalcule les records d'un seul (user, exercice) après modification ou suppression
+    d'un log, le record pouvant alors baisser. Ne commit pas.
+    """
+    _recompute(session, user_id=user_id, exercise_ids=[exercise_id])
+
+
+def rebuild_personal_records(session: Session, user_id: Optional[int] = None) -> None:
+    """Reconstruit la table (backfill) pour tous les utilisateurs ou un seul."""
+    try:
+        _recompute(session, user_id=user_id)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+
+def _recompute(session: Session, user_id: Optional[int] = None, exercise_ids: Optional[List[int]] = None) -> None:
+    delete_stmt = delete(PersonalRecord)
+    filters = ""
+    params = {"targets": list(PR_REP_TARGETS)}
+    if user_id is not None:
+        delete_stmt = delete_stmt.where(PersonalRecord.user_id == user_id)
+        filters += " AND l.user_id = :user_id"
+        params["user_id"] = user_id
+    if exercise_ids:
+        delete_stmt = delete_stmt.where(PersonalRecord.exercise_id.in_(exercise_ids))
+        filters += " AND l.exercise_id = ANY(:exercise_ids)"
+        params["exercise_ids"] = list(exercise_ids)
+
+    session.execute(delete_stmt)
+    session.execute(text(_RECOMPUTE_SQL.format(filters=filters)), params)
+
+
+def get_personal_records(session: Session, user_id: int, exercise_id: Optional[int] = None) -> List[PersonalRecordOut]:
+    query = (
+        select(
+            PersonalRecord.exercise_id,
+            Exercise.name.label("exercise_name"),
+            PersonalRecord.reps,
+            PersonalRecord.weight,
+            PersonalRecord.log_id,
+            PersonalRecord.achieved_at,
+        )
+        .join(Exercise, Exercise.id == PersonalRecord.exercise_id)
+        .where(PersonalRecord.user_id == user_id)
+        .order_by(Exercise.name, PersonalRecord.reps)
+    )
+    if exercise_id:
+        query = query.where(PersonalRecord.exercise_id == exercise_id)
+    rows = session.execute(query).mappings().all()
+    return [PersonalRecordOut.model_validate(dict(r)) for r in rows]
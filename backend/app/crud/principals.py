@@ -0,0 +1,132 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database.cache import KEY_PREFIX, bump_version, get_cache, get_version, run_cache_io
+from app.database.config import settings
+from app.models.base import User
+
+logger = logging.getLogger(__name__)
+
+# Cache du user authentifié (le "principal") : évite un aller-retour Postgres par requête
+# protégée. Le JWT reste décodé et vérifié à chaque requête ; seul le user est mis en cache.
+#
+# - L1 : LRU en mémoire, TTL court (PRINCIPAL_CACHE_TTL).
+# - L2 : backend de cache partagé (Redis) s'il y en a un, clé versionnée comme cached_json.
+# La version combine un compteur local et la version partagée du scope "principal" :
+# update/delete l'incrémentent, les autres workers voient le changement dès la requête
+# suivante. Sans backend partagé, l'invalidation ne vaut que pour ce process.
+# Le hash du mot de passe n'est jamais mis en cache.
+
+_local: "OrderedDict[int, Tuple[str, float, dict]]" = OrderedDict()
+_local_versions: dict = {}
+_lock = threading.Lock()
+
+
+def _version(user_id: int) -> Optional[str]:
+    local = _local_versions.get(user_id, 0)
+    if get_cache() is None:
+        return f"{local}"
+    shared = get_version("principal", user_id)
+    if shared is None:
+        return None  # cache partagé indisponible : on ne peut pas prouver la fraîcheur
+    return f"{local}:{shared}"
+
+
+def _key(user_id: int, version: str) -> str:
+    return f"{KEY_PREFIX}:principal:{user_id}:v{version}"
+
+
+def _cached(user_id: int, version: str) -> Optional[dict]:
+    with _lock:
+        entry = _local.get(user_id)
+        if entry and entry[0] == version and entry[1] > time.monotonic():
+            _local.move_to_end(user_id)
+            return entry[2]
+    backend = get_cache()
+    if backend is None:
+        return None
+    try:
+        raw = backend.get(_key(user_id, version))
+    except Exception as e:
+        logger.warning(f"Principal cache read failed: {e}")
+        return None
+    if raw is None:
+        return None
+    data = json.loads(raw)
+    _remember_local(user_id, version, data)
+    return data
+
+
+def _remember_local(user_id: int, version: str, data: dict) -> None:
+    with _lock:
+        _local[user_id] = (version, time.monotonic() + settings.PRINCIPAL_CACHE_TTL, data)
+        _local.move_to_end(user_id)
+        while len(_local) > settings.PRINCIPAL_CACHE_SIZE:
+            _local.popitem(last=False)
+
+
+def _remember(user_id: int, version: str, user: User) -> dict:
+    data = user.model_dump(mode="json", exclude={"hashed_password"})
+    _remember_local(user_id, version, data)
+    backend = get_cache()
+    if backend is not None:
+        try:
+            backend.set(_key(user_id, version), json.dumps(data).encode(), settings.CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"Principal cache write failed: {e}")
+    return data
+
+
+def _lookup(user_id: int) -> Tuple[Optional[str], Optional[dict]]:
+    # Version puis entrée : un seul passage par le threadpool côté async
+    version = _version(user_id)
+    if version is None:
+        return None, None
+    return version, _cached(user_id, version)
+
+
+def _principal(data: dict) -> User:
+    # Instance transiente (hors session) ; recharger le user pour toute écriture
+    return User.model_validate({**data, "hashed_password": ""})
+
+
+def get_principal(session: Session, user_id: int) -> Optional[User]:
+    if settings.PRINCIPAL_CACHE_TTL <= 0:
+        return session.get(User, user_id)
+    version, data = _lookup(user_id)
+    if version is None:
+        return session.get(User, user_id)
+    if data is None:
+        user = session.get(User, user_id)
+        if user is None:
+            return None
+        data = _remember(user_id, version, user)
+    return _principal(data)
+
+
+async def get_principal_async(session: AsyncSession, user_id: int) -> Optional[User]:
+    if settings.PRINCIPAL_CACHE_TTL <= 0:
+        return await session.get(User, user_id)
+    # Le backend partagé (Redis, client sync) est interrogé hors de la boucle
+    version, data = await run_cache_io(_lookup, user_id)
+    if version is None:
+        return await session.get(User, user_id)
+    if data is None:
+        user = await session.get(User, user_id)
+        if user is None:
+            return None
+        data = await run_cache_io(_remember, user_id, version, user)
+    return _principal(data)
+
+
+def invalidate_principal(user_id: int) -> None:
+    """À appeler après le commit de toute écriture sur le user (profil, mot de passe, suppression)."""
+    with _lock:
+        _local_versions[user_id] = _local_versions.get(user_id, 0) + 1
+        _local.pop(user_id, None)
+    bump_version("principal", user_id)
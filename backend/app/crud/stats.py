@@ -0,0 +1,70 @@
+from typing import Optional
+from datetime import date
+from sqlalchemy import Date, cast, func, literal_column, select
+from sqlalchemy.orm import Session
+from app.models.base import UserExerciseLog, Exercise
+from app.schemas.stats import StatsPeriod, ExerciseStats, ExerciseStatsBucket, UserStats
+
+
+def get_user_stats(
+    session: Session,
+    user_id: int,
+    period: StatsPeriod = StatsPeriod.WEEK,
+    exercise_id: Optional[int] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> UserStats:
+    """
+    Agrège les logs en SQL (GROUP BY date_trunc) : une ligne par (période, exercice),
+    la taille de la réponse ne dépend pas du nombre de séries.
+    """
+    # Le champ de date_trunc est inliné (valeur issue de l'enum) pour que l'expression
+    # du SELECT et celle du GROUP BY soient identiques pour Postgres.
+    # On regroupe sur training_date (jour local du pratiquant) plutôt que sur l'heure serveur.
+    # date_trunc renvoie un timestamptz à minuit dans le fuseau de la session : recasté en
+    # date, le bucket reste le jour local, quel que soit le TimeZone du serveur.
+    bucket = cast(func.date_trunc(literal_column(f"'{period.value}'"), UserExerciseLog.training_date), Date).label("bucket")
+    volume = func.coalesce(
+        UserExerciseLog.volume,
+        UserExerciseLog.reps * func.coalesce(UserExerciseLog.weight, 0),
+    )
+
+    query = (
+        select(
+            bucket,
+            UserExerciseLog.exercise_id,
+            Exercise.name.label("exercise_name"),
+            func.coalesce(func.sum(volume), 0).label("volume"),
+            func.max(UserExerciseLog.weight).label("top_weight"),
+            func.coalesce(func.sum(UserExerciseLog.reps), 0).label("total_reps"),
+            func.count(UserExerciseLog.id).label("set_count"),
+        )
+        .join(Exercise, Exercise.id == UserExerciseLog.exercise_id)
+        .where(UserExerciseLog.user_id == user_id)
+        .group_by(bucket, UserExerciseLog.exercise_id, Exercise.name)
+        .order_by(Exercise.name, bucket)
+    )
+    if exercise_id:
+        query = query.where(UserExerciseLog.exercise_id == exercise_id)
+    # Bornes en jours locaux, incluses comme pour le calendrier : filtrer sur date (UTC)
+    # décalerait les séries de fin/début de journée par rapport à leur bucket
+    if start:
+        query = query.where(UserExerciseLog.training_date >= start)
+    if end:
+        query = query.where(UserExerciseLog.training_date <= end)
+
+    by_exercise = {}
+    for row in session.execute(query).mappings():
+        stats = by_exercise.get(row["exercise_id"])
+        if stats is None:
+            stats = ExerciseStats(exercise_id=row["exercise_id"], exercise_name=row["exercise_name"], buckets=[])
+            by_exercise[row["exercise_id"]] = stats
+        stats.buckets.append(ExerciseStatsBucket(
+            bucket=row["bucket"],
+            volume=row["volume"],
+            top_weight=row["top_weight"],
+            total_reps=row["total_reps"],
+            set_count=row["set_count"],
+        ))
+
+    return UserStats(period=period, exercises=list(by_exercise.values()))
@@ -1,18 +1,64 @@
 from typing import List, Optional
 from sqlmodel import select
 from sqlalchemy.orm import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.base import User
+from app.database.cache import bump_version
+from app.crud.principals import invalidate_principal
+from app.crud.pagination import decode_cursor
 from app.schemas.user import UserCreate, UserUpdate, UserOut
-from passlib.context import CryptContext
-from datetime import datetime
-
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+from app.crud.passwords import pwd_context, hash_password, verify_and_update, verify_and_update_async
+from datetime import datetime, date, timezone
+from zoneinfo import ZoneInfo
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return hash_password(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return verify_and_update(plain_password, hashed_password)[0]
+
+def authenticate_user(email: str, password: str, session: Session) -> Optional[User]:
+    user = session.exec(select(User).where(User.email == email)).first()
+    if not user:
+        return None
+    valid, new_hash = verify_and_update(password, user.hashed_password)
+    if not valid:
+        return None
+    if new_hash:
+        # Paramètres argon2 modifiés : le hash stocké est remplacé de façon transparente
+        user.hashed_password = new_hash
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+    return user
+
+async def authenticate_user_async(email: str, password: str, session: AsyncSession) -> Optional[User]:
+    user = (await session.exec(select(User).where(User.email == email))).first()
+    if not user:
+        return None
+    valid, new_hash = await verify_and_update_async(password, user.hashed_password)
+    if not valid:
+        return None
+    if new_hash:
+        user.hashed_password = new_hash
+        session.add(user)
+        await session.commit()
+    return user
+
+def get_user_timezone(session: Session, user_id: int) -> ZoneInfo:
+    tz_name = session.exec(select(User.timezone).where(User.id == user_id)).first()
+    return ZoneInfo(tz_name or "UTC")
+
+def to_training_date(moment: datetime, tz: ZoneInfo) -> date:
+    # Les dates des logs sont stockées en UTC naïf : on les ramène au jour local du pratiquant
+    return moment.replace(tzinfo=timezone.utc).astimezone(tz).date()
+
+def user_today(session: Session, user_id: int) -> date:
+    return datetime.now(get_user_timezone(session, user_id)).date()
+
+async def user_today_async(session: AsyncSession, user_id: int) -> date:
+    tz_name = (await session.exec(select(User.timezone).where(User.id == user_id))).first()
+    return datetime.now(ZoneInfo(tz_name or "UTC")).date()
 
 def create_user(user_in: UserCreate, session: Session) -> User:
     hashed_password = get_password_hash(user_in.password)
@@ -31,8 +77,12 @@ def create_user(user_in: UserCreate, session: Session) -> User:
 def get_user(user_id: int, session: Session) -> Optional[User]:
     return session.get(User, user_id)
 
-def get_users(session: Session, offset: int = 0, limit: int = 100) -> List[User]:
-    users = session.exec(select(User).offset(offset).limit(limit)).all()
+def get_users(session: Session, offset: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[User]:
+    query = select(User).order_by(User.id).offset(offset).limit(limit)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        query = query.where(User.id > last_id)
+    users = session.exec(query).all()
     return users
 
 def update_user(user_id: int, user_update: UserUpdate, session: Session) -> Optional[User]:
@@ -44,6 +94,8 @@ def update_user(user_id: int, user_update: UserUpdate, session: Session) -> Opti
     # normalize field name if frontend sends body_fat_percentage
     if "body_fat_percentage" in update_data:
         update_data["body_fat"] = update_data.pop("body_fat_percentage")
+    if update_data.get("timezone") is None:
+        update_data.pop("timezone", None)
 
     
     # --- VÉRIFICATION UNIQUE (EMAIL) ---
@@ -82,6 +134,8 @@ def update_user(user_id: int, user_update: UserUpdate, session: Session) -> Opti
     except Exception as e:
         session.rollback()
         raise e 
+    bump_version("user", user_id)  # le fuseau peut changer le "jour" du dashboard
+    invalidate_principal(user_id)
         
     return user
 
@@ -92,6 +146,7 @@ def update_user_password(user: User, new_password: str, session: Session) -> Use
     session.add(user)
     session.commit()
     session.refresh(user)
+    invalidate_principal(user.id)
     return user
 
 def delete_user(user_id: int, session: Session) -> bool:
@@ -100,4 +155,5 @@ def delete_user(user_id: int, session: Session) -> bool:
         return False
     session.delete(user)
     session.commit()
+    invalidate_principal(user_id)
     return True
\ No newline at end of file
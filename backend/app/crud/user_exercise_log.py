@@ -1,13 +1,28 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional, Set
 from sqlmodel import select
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import datetime, date
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import String, distinct, func, insert, literal, null, or_, tuple_, union_all, select as sa_select
+from datetime import datetime, date, timedelta
+from zoneinfo import ZoneInfo
 from app.database.db import get_session
+from app.database.cache import bump_version, run_cache_io
 from app.models.base import UserExerciseLog, User, Exercise, Workout
-from app.schemas.user_exercise_log import UserExerciseLogCreate, UserExerciseLogUpdate, UserExerciseLogOut, AddLogsToWorkout
+from app.crud.personal_records import record_logs, refresh_exercise_records
+from app.crud.user import get_user_timezone, to_training_date
+from app.crud.pagination import decode_cursor, next_cursor
+from app.schemas.exercises import ExerciseOut
+from app.schemas.user_exercise_log import (
+    UserExerciseLogCreate,
+    UserExerciseLogUpdate,
+    UserExerciseLogBase,
+    UserExerciseLogFlat,
+    UserExerciseLogExpanded,
+    WorkoutRef,
+    AddLogsToWorkout,
+)
 
-def create_user_exercise_log(log_in: UserExerciseLogCreate, session: Session) -> UserExerciseLogOut:
+def create_user_exercise_log(log_in: UserExerciseLogCreate, session: Session) -> UserExerciseLogBase:
     user = session.get(User, log_in.user_id)  # Assumé user_id toujours fourni
     if not user:
         raise ValueError("User not found")
@@ -20,12 +35,14 @@ def create_user_exercise_log(log_in: UserExerciseLogCreate, session: Session) ->
             raise ValueError("Workout not found")
 
     volume = log_in.volume or (log_in.reps * log_in.weight or 0)  
+    now = datetime.utcnow()
 
     db_log = UserExerciseLog(
         user_id=log_in.user_id,
         exercise_id=log_in.exercise_id,
         workout_id=log_in.workout_id,
-        date=datetime.now(),  # Ou log_in.date si fourni
+        date=now,  # Ou log_in.date si fourni
+        training_date=to_training_date(now, ZoneInfo(user.timezone)),
         set_number=log_in.set_number,
         reps=log_in.reps,
         weight=log_in.weight,
@@ -36,26 +53,196 @@ def create_user_exercise_log(log_in: UserExerciseLogCreate, session: Session) ->
         notes=log_in.notes
     )
     session.add(db_log)
+    session.flush()
+    record_logs(session, [db_log])
     session.commit()
     session.refresh(db_log)
-    return UserExerciseLogOut.model_validate(db_log)
-
-def add_logs_to_workout(session: Session, user_id: int, workout_id: Optional[int], logs_data: AddLogsToWorkout ) -> List[UserExerciseLogOut]:
-    added = []
-    for log_in in logs_data.logs:
-        log_in.user_id = user_id  
-        log_in.workout_id = workout_id
-        added.append(create_user_exercise_log(log_in, session))
-    return added
-
-def get_user_exercise_logs(session: Session, user_id: int, offset: int = 0, limit: int = 100, exercise_id: Optional[int] = None, workout_id: Optional[int] = None) -> List[UserExerciseLogOut]:
-    query = select(UserExerciseLog).where(UserExerciseLog.user_id == user_id).offset(offset).limit(limit)
+    bump_version("user", log_in.user_id)
+    return UserExerciseLogBase.model_validate(db_log)
+
+def _check_log_references(session: Session, user_id: int, exercise_ids: Set[int], workout_ids: Set[int]) -> ZoneInfo:
+    # Toutes les FK du batch sont vérifiées en une seule requête (UNION ALL),
+    # qui ramène aussi le fuseau du user pour calculer training_date
+    no_tz = null().cast(String)
+    checks = [select(literal("user").label("kind"), User.id.label("id"), User.timezone.label("timezone")).where(User.id == user_id)]
+    if exercise_ids:
+        checks.append(select(literal("exercise"), Exercise.id, no_tz).where(Exercise.id.in_(exercise_ids)))
+    if workout_ids:
+        checks.append(
+            select(literal("workout"), Workout.id, no_tz).where(
+                Workout.id.in_(workout_ids), or_(Workout.user_id == user_id, Workout.template_key.is_not(None))
+            )
+        )
+    found = {"user": set(), "exercise": set(), "workout": set()}
+    tz_name = None
+    for kind, ref_id, ref_tz in session.execute(union_all(*checks)).all():
+        found[kind].add(ref_id)
+        if kind == "user":
+            tz_name = ref_tz
+
+    if not found["user"]:
+        raise ValueError("User not found")
+    missing_exercises = exercise_ids - found["exercise"]
+    if missing_exercises:
+        raise ValueError(f"Exercise not found: {', '.join(map(str, sorted(missing_exercises)))}")
+    missing_workouts = workout_ids - found["workout"]
+    if missing_workouts:
+        raise ValueError(f"Workout not found: {', '.join(map(str, sorted(missing_workouts)))}")
+    return ZoneInfo(tz_name or "UTC")
+
+def bulk_create_logs(session: Session, user_id: int, logs_in: List[UserExerciseLogCreate], workout_id: Optional[int] = None) -> List[UserExerciseLogBase]:
+    """
+    Insère un batch de séries en une transaction : 1 requête de validation,
+    1 INSERT multi-lignes avec RETURNING, 1 commit.
+    """
+    created = _insert_logs(session, user_id, logs_in, workout_id)
+    if created:
+        bump_version("user", user_id)
+    return created
+
+def _insert_logs(session: Session, user_id: int, logs_in: List[UserExerciseLogCreate], workout_id: Optional[int]) -> List[UserExerciseLogBase]:
+    if not logs_in:
+        return []
+
+    now = datetime.utcnow()
+    rows = []
+    for log_in in logs_in:
+        rows.append({
+            "user_id": user_id,
+            "exercise_id": log_in.exercise_id,
+            "workout_id": workout_id if workout_id is not None else log_in.workout_id,
+            "date": now,
+            "set_number": log_in.set_number,
+            "reps": log_in.reps,
+            "weight": log_in.weight,
+            "rest_seconds": log_in.rest_seconds,
+            "duration_seconds": log_in.duration_seconds,
+            "distance_m": log_in.distance_m,
+            "volume": log_in.volume or (log_in.reps * (log_in.weight or 0)),
+        })
+
+    tz = _check_log_references(
+        session,
+        user_id,
+        exercise_ids={r["exercise_id"] for r in rows},
+        workout_ids={r["workout_id"] for r in rows if r["workout_id"]},
+    )
+    training_date = to_training_date(now, tz)
+    for row in rows:
+        row["training_date"] = training_date
+
+    try:
+        created = session.execute(
+            insert(UserExerciseLog).values(rows).returning(*UserExerciseLog.__table__.c)
+        ).mappings().all()
+        record_logs(session, [dict(r) for r in created])
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return [UserExerciseLogBase.model_validate(dict(r)) for r in created]
+
+async def bulk_create_logs_async(session: AsyncSession, user_id: int, logs_in: List[UserExerciseLogCreate], workout_id: Optional[int] = None) -> List[UserExerciseLogBase]:
+    # L'écriture (validation, INSERT, records) reste celle de la version sync, exécutée sur
+    # la connexion asyncpg via run_sync ; l'invalidation (Redis) se fait hors de la boucle
+    created = await session.run_sync(_insert_logs, user_id, logs_in, workout_id)
+    if created:
+        await run_cache_io(bump_version, "user", user_id)
+    return created
+
+def add_logs_to_workout(session: Session, user_id: int, workout_id: Optional[int], logs_data: AddLogsToWorkout ) -> List[UserExerciseLogBase]:
+    return bulk_create_logs(session, user_id, logs_data.logs, workout_id=workout_id)
+
+LOG_EXPANSIONS = {"exercise", "workout"}
+
+def parse_log_expand(expand: Optional[str]) -> Set[str]:
+    if not expand:
+        return set()
+    requested = {part.strip() for part in expand.split(",") if part.strip()}
+    unknown = requested - LOG_EXPANSIONS
+    if unknown:
+        raise ValueError(f"Unknown expand value(s): {', '.join(sorted(unknown))}")
+    return requested
+
+def _filter_logs(query, user_id: int, exercise_id: Optional[int], workout_id: Optional[int], cursor: Optional[str] = None):
+    query = query.where(UserExerciseLog.user_id == user_id)
     if exercise_id:
         query = query.where(UserExerciseLog.exercise_id == exercise_id)
+    if workout_id:
+        query = query.where(UserExerciseLog.workout_id == workout_id)
+    if cursor:
+        # Keyset sur (date, id) décroissants : couvert par l'index (user_id, date, id)
+        last_date, last_id = decode_cursor(cursor, datetime.fromisoformat, int)
+        query = query.where(tuple_(UserExerciseLog.date, UserExerciseLog.id) < tuple_(last_date, last_id))
+    return query
+
+def log_cursor(logs: List[UserExerciseLogBase], limit: int) -> Optional[str]:
+    return next_cursor(logs, limit, lambda l: (l.date, l.id))
+
+def _flat_logs_select():
+    # Une seule requête : les champs exercise/workout utiles sont joints au lieu d'être lazy-loadés par ligne
+    return (
+        sa_select(
+            *UserExerciseLog.__table__.c,
+            Exercise.name.label("exercise_name"),
+            Exercise.muscle_group,
+            Exercise.is_cardio,
+            Workout.name.label("workout_name"),
+        )
+        .join(Exercise, Exercise.id == UserExerciseLog.exercise_id)
+        .outerjoin(Workout, Workout.id == UserExerciseLog.workout_id)
+    )
+
+def _flat_logs_query(user_id: int, offset: int, limit: int, exercise_id: Optional[int], workout_id: Optional[int], cursor: Optional[str] = None):
+    query = _filter_logs(_flat_logs_select(), user_id, exercise_id, workout_id, cursor)
+    return query.order_by(UserExerciseLog.date.desc(), UserExerciseLog.id.desc()).offset(offset).limit(limit)
+
+def get_user_exercise_logs(session: Session, user_id: int, offset: int = 0, limit: int = 100, exercise_id: Optional[int] = None, workout_id: Optional[int] = None, cursor: Optional[str] = None) -> List[UserExerciseLogFlat]:
+    rows = session.execute(_flat_logs_query(user_id, offset, limit, exercise_id, workout_id, cursor)).mappings().all()
+    return [UserExerciseLogFlat.model_validate(dict(r)) for r in rows]
+
+async def get_user_exercise_logs_async(session: AsyncSession, user_id: int, offset: int = 0, limit: int = 100, exercise_id: Optional[int] = None, workout_id: Optional[int] = None, cursor: Optional[str] = None) -> List[UserExerciseLogFlat]:
+    rows = (await session.execute(_flat_logs_query(user_id, offset, limit, exercise_id, workout_id, cursor))).mappings().all()
+    return [UserExerciseLogFlat.model_validate(dict(r)) for r in rows]
+
+def iter_user_exercise_log_batches(session: Session, user_id: int, batch_size: int = 1000) -> Iterator[list]:
+    """
+    Tout l'historique du user, du plus ancien au plus récent, par lots de `batch_size`
+    lignes (mappings) lus via un curseur serveur : rien n'est chargé en entier.
+    """
+    query = _filter_logs(_flat_logs_select(), user_id, None, None).order_by(UserExerciseLog.date, UserExerciseLog.id)
+    result = session.execute(query.execution_options(yield_per=batch_size))
+    for partition in result.mappings().partitions():
+        yield partition
+
+def get_user_exercise_logs_expanded(session: Session, user_id: int, expand: Set[str], offset: int = 0, limit: int = 100, exercise_id: Optional[int] = None, workout_id: Optional[int] = None, cursor: Optional[str] = None) -> UserExerciseLogExpanded:
+    query = _filter_logs(select(UserExerciseLog), user_id, exercise_id, workout_id, cursor)
+    query = query.order_by(UserExerciseLog.date.desc(), UserExerciseLog.id.desc()).offset(offset).limit(limit)
     logs = session.exec(query).all()
-    return [UserExerciseLogOut.model_validate(l) for l in logs]
 
-def update_user_exercise_log(session: Session, log_id: int, log_update: UserExerciseLogUpdate) -> Optional[UserExerciseLogOut]:
+    # Les relations sont chargées une fois par réponse (IN sur les ids distincts), pas une fois par ligne
+    exercises = {}
+    if "exercise" in expand:
+        exercise_ids = {l.exercise_id for l in logs}
+        if exercise_ids:
+            rows = session.exec(select(Exercise).where(Exercise.id.in_(exercise_ids))).all()
+            exercises = {e.id: ExerciseOut.model_validate(e) for e in rows}
+
+    workouts = {}
+    if "workout" in expand:
+        workout_ids = {l.workout_id for l in logs if l.workout_id}
+        if workout_ids:
+            rows = session.exec(select(Workout).where(Workout.id.in_(workout_ids))).all()
+            workouts = {w.id: WorkoutRef.model_validate(w) for w in rows}
+
+    return UserExerciseLogExpanded(
+        logs=[UserExerciseLogBase.model_validate(l) for l in logs],
+        exercises=exercises,
+        workouts=workouts,
+        next_cursor=log_cursor(logs, limit),
+    )
+
+def update_user_exercise_log(session: Session, log_id: int, log_update: UserExerciseLogUpdate) -> Optional[UserExerciseLogBase]:
     log = session.get(UserExerciseLog, log_id)
     if not log:
         return None
@@ -63,30 +250,82 @@ def update_user_exercise_log(session: Session, log_id: int, log_update: UserExer
     for field, value in update_data.items():
         setattr(log, field, value)
     session.add(log)
+    session.flush()
+    if "weight" in update_data or "reps" in update_data:
+        refresh_exercise_records(session, log.user_id, log.exercise_id)
     session.commit()
     session.refresh(log)
-    return UserExerciseLogOut.model_validate(log)
+    bump_version("user", log.user_id)
+    return UserExerciseLogBase.model_validate(log)
 
 def delete_user_exercise_log(session: Session, log_id: int) -> bool:
     log = session.get(UserExerciseLog, log_id)
     if not log:
         return False
+    user_id, exercise_id = log.user_id, log.exercise_id
     session.delete(log)
+    session.flush()
+    refresh_exercise_records(session, user_id, exercise_id)
     session.commit()
+    bump_version("user", user_id)
     return True
 
-def create_log(log_in: UserExerciseLogCreate, user_id: int, session: Session) -> UserExerciseLogOut:
+def create_log(log_in: UserExerciseLogCreate, user_id: int, session: Session) -> UserExerciseLogBase:
     log_data = log_in.model_dump()
-    db_log = UserExerciseLog(**log_data, user_id=user_id)
+    now = datetime.utcnow()
+    training_date = to_training_date(now, get_user_timezone(session, user_id))
+    db_log = UserExerciseLog(**log_data, user_id=user_id, date=now, training_date=training_date)
     session.add(db_log)
+    session.flush()
+    record_logs(session, [db_log])
     session.commit()
     session.refresh(db_log)
-    return UserExerciseLogOut.model_validate(db_log)
+    bump_version("user", user_id)
+    return UserExerciseLogBase.model_validate(db_log)
 
 def get_logs_for_date(user_id: int, target_date: date, session: Session) -> List[UserExerciseLog]:
     return session.exec(
         select(UserExerciseLog).where(
             UserExerciseLog.user_id == user_id,
-            func.date(UserExerciseLog.date) == target_date
+            UserExerciseLog.training_date == target_date
+        )
+    ).all()
+
+def get_training_days(session: Session, user_id: int, start: date, end: date) -> List[date]:
+    """Jours (locaux) avec au moins une série entre start et end inclus : range scan sur l'index (user_id, training_date)."""
+    return session.exec(
+        select(distinct(UserExerciseLog.training_date))
+        .where(
+            UserExerciseLog.user_id == user_id,
+            UserExerciseLog.training_date >= start,
+            UserExerciseLog.training_date <= end,
         )
-    ).all()
\ No newline at end of file
+        .order_by(UserExerciseLog.training_date)
+    ).all()
+
+def get_weekly_streak(session: Session, user_id: int, today: date) -> int:
+    """
+    Nombre de semaines consécutives avec au moins une séance. La semaine en cours
+    ne casse pas la série tant qu'elle n'est pas terminée.
+    """
+    # Parcours de l'index (user_id, training_date) à rebours, en s'arrêtant au premier trou
+    days = session.exec(
+        select(distinct(UserExerciseLog.training_date))
+        .where(UserExerciseLog.user_id == user_id, UserExerciseLog.training_date <= today)
+        .order_by(UserExerciseLog.training_date.desc())
+    )
+    expected_week = today - timedelta(days=today.weekday())
+    streak = 0
+    for day in days:
+        week = day - timedelta(days=day.weekday())
+        if week == expected_week:
+            streak += 1
+            expected_week -= timedelta(days=7)
+        elif week < expected_week:
+            if streak == 0 and week == expected_week - timedelta(days=7):
+                # Rien encore cette semaine : la série part de la semaine dernière
+                streak = 1
+                expected_week = week - timedelta(days=7)
+            else:
+                break
+    return streak
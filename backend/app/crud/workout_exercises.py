@@ -1,12 +1,19 @@
 from typing import List, Optional
-from sqlmodel import select
+from sqlmodel import select, func
 from sqlalchemy.orm import Session
 from app.database.db import get_session
+from app.database.cache import bump_version
 from app.models.base import WorkoutExercise, Workout, Exercise
+from app.crud.workout_templates import get_templates, materialize_template
 from app.schemas.workout_exercises import WorkoutExerciseCreate, WorkoutExerciseUpdate, WorkoutExerciseOut, AddExercisesToWorkout  # <--- AJOUT COMPLET
 
 # Fichier : app/crud/workout_exercises.py
 
+def _invalidate_workout(workout: Optional[Workout]) -> None:
+    if workout:
+        bump_version("user", workout.user_id)
+        bump_version("workout", workout.id)
+
 def create_workout_exercise(exercise_in: WorkoutExerciseCreate, workout_id: int, session: Session) -> WorkoutExerciseOut:
 
     workout = session.get(Workout, workout_id)
@@ -17,18 +24,38 @@ def create_workout_exercise(exercise_in: WorkoutExerciseCreate, workout_id: int,
         raise ValueError("Exercise not found")
 
     exercise_data = exercise_in.model_dump(exclude_unset=True)
+    # Ajouté en fin de plan
+    position = session.exec(
+        select(func.coalesce(func.max(WorkoutExercise.position) + 1, 0)).where(WorkoutExercise.workout_id == workout_id)
+    ).one()
 
     db_exercise = WorkoutExercise(
         workout_id=workout_id,
+        position=position,
         **exercise_data  
     )
     
     session.add(db_exercise)
     session.commit()
     session.refresh(db_exercise)
+    _invalidate_workout(workout)
     return WorkoutExerciseOut.model_validate(db_exercise)
 
-def add_exercises_to_workout(workout_id: int, exercises_data: AddExercisesToWorkout, session: Session) -> List[WorkoutExerciseOut]:
+def add_exercises_to_workout(workout_id: int, exercises_data: AddExercisesToWorkout, session: Session, user_id: int) -> Optional[List[WorkoutExerciseOut]]:
+    """None si le workout n'existe pas ou appartient à un autre user."""
+    template = get_templates(session).by_id.get(workout_id)
+    if template:
+        # Copy-on-write : les exercices sont ajoutés à la copie du user
+        try:
+            workout_id = materialize_template(session, template, user_id)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+    else:
+        workout = session.get(Workout, workout_id)
+        if not workout or workout.user_id != user_id:
+            return None
     added = []
     for exercise_in in exercises_data.exercises:
         added.append(create_workout_exercise(exercise_in, workout_id, session))
@@ -36,7 +63,9 @@ def add_exercises_to_workout(workout_id: int, exercises_data: AddExercisesToWork
 
 def get_workout_exercises(workout_id: int, session: Session) -> List[WorkoutExerciseOut]:
     exercises = session.exec(
-        select(WorkoutExercise).where(WorkoutExercise.workout_id == workout_id)
+        select(WorkoutExercise)
+        .where(WorkoutExercise.workout_id == workout_id)
+        .order_by(WorkoutExercise.position, WorkoutExercise.id)
     ).all()
     return [WorkoutExerciseOut.model_validate(e) for e in exercises]
 
@@ -50,12 +79,15 @@ def update_workout_exercise(exercise_id: int, exercise_update: WorkoutExerciseUp
     session.add(exercise)
     session.commit()
     session.refresh(exercise)
+    _invalidate_workout(session.get(Workout, exercise.workout_id))
     return WorkoutExerciseOut.model_validate(exercise)
 
 def delete_workout_exercise(exercise_id: int, session: Session) -> bool:
     exercise = session.get(WorkoutExercise, exercise_id)
     if not exercise:
         return False
+    workout = session.get(Workout, exercise.workout_id)
     session.delete(exercise)
     session.commit()
+    _invalidate_workout(workout)
     return True
\ No newline at end of file
@@ -0,0 +1,225 @@
+import logging
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import List, Mapping, Optional, Tuple
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, selectinload
+from app.models.base import Exercise, HiddenWorkoutTemplate, User, Workout, WorkoutExercise
+from app.crud.exercises import get_catalog
+from app.schemas.workouts import WorkoutDetail
+
+# Workouts de base partagés : stockés une seule fois (workouts.user_id NULL, template_key),
+# visibles par tous les users `uses_templates`. Une modification crée une copie pour le
+# user (copy-on-write) et masque le template pour lui ; l'inscription n'insère plus rien.
+# Les templates sont créés par la préparation de la base (app/database/startup.py), jamais
+# sur un chemin de lecture.
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TemplateSnapshot:
+    version: str  # version du catalogue : les exercices imbriqués suivent ses modifications
+    workouts: Tuple[WorkoutDetail, ...]
+    by_id: Mapping[int, WorkoutDetail]
+
+_snapshot: Optional[TemplateSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def create_missing_templates(session: Session) -> int:
+    """
+    Crée les templates absents et retourne leur nombre. Idempotent et sûr entre répliques
+    (ON CONFLICT sur template_key). Ne commit pas : appelé dans la transaction du seed.
+    """
+    names = {ex_data["name"] for data in DEFAULT_WORKOUTS_DATA for ex_data in data["exercises"]}
+    by_name = dict(session.execute(select(Exercise.name, Exercise.id).where(Exercise.name.in_(names))).all())
+    created = 0
+    for data in DEFAULT_WORKOUTS_DATA:
+        template_id = session.execute(
+            pg_insert(Workout)
+            .values(name=data["name"], template_key=data["key"])
+            .on_conflict_do_nothing(index_elements=["template_key"])
+            .returning(Workout.id)
+        ).scalar_one_or_none()
+        if template_id is None:
+            continue
+        created += 1
+        rows = []
+        for ex_data in data["exercises"]:
+            exercise_id = by_name.get(ex_data["name"])
+            if not exercise_id:
+                logger.warning(f"Exercice de base '{ex_data['name']}' non trouvé dans la BDD. Il ne sera pas ajouté au template '{data['key']}'.")
+                continue
+            rows.append({
+                "workout_id": template_id,
+                "exercise_id": exercise_id,
+                "planned_sets": ex_data["sets"],
+                "planned_reps": int(ex_data["reps_str"]),
+                "rest_seconds": ex_data["rest"],
+                "notes": ex_data["notes"],
+                "position": len(rows),
+            })
+        if rows:
+            session.execute(insert(WorkoutExercise), rows)
+    return created
+
+
+def _load_templates(session: Session) -> List[Workout]:
+    return session.execute(
+        select(Workout)
+        .options(selectinload(Workout.workout_exercises).selectinload(WorkoutExercise.exercise))
+        .where(Workout.template_key.is_not(None))
+        .order_by(Workout.id)
+    ).scalars().all()
+
+
+def get_templates(session: Session) -> TemplateSnapshot:
+    global _snapshot
+    version = get_catalog(session).version
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    with _snapshot_lock:
+        if _snapshot is None or _snapshot.version != version:
+            templates = _load_templates(session)
+            if len(templates) < len(DEFAULT_WORKOUTS_DATA):
+                # Lecture seule : on sert ce qui existe, la création revient au démarrage
+                logger.warning(
+                    f"{len(DEFAULT_WORKOUTS_DATA) - len(templates)} base workout template(s) missing, "
+                    "run python -m app.database.startup"
+                )
+            workouts = tuple(WorkoutDetail.model_validate(t) for t in templates)
+            _snapshot = TemplateSnapshot(
+                version=version,
+                workouts=workouts,
+                by_id=MappingProxyType({w.id: w for w in workouts}),
+            )
+        return _snapshot
+
+
+def visible_template_ids(session: Session, user_id: int) -> List[int]:
+    """Templates que voit un user : tous, sauf ceux qu'il a supprimés ou déjà copiés."""
+    rows = session.execute(
+        select(User.uses_templates, HiddenWorkoutTemplate.template_id)
+        .outerjoin(HiddenWorkoutTemplate, HiddenWorkoutTemplate.user_id == User.id)
+        .where(User.id == user_id)
+    ).all()
+    if not rows or not rows[0].uses_templates:
+        return []
+    hidden = {row.template_id for row in rows}
+    return [t.id for t in get_templates(session).workouts if t.id not in hidden]
+
+
+def _hide(session: Session, user_id: int, template_id: int) -> bool:
+    # Faux si le template était déjà masqué : la clé primaire sérialise les appels concurrents
+    hidden = session.execute(
+        pg_insert(HiddenWorkoutTemplate)
+        .values(user_id=user_id, template_id=template_id)
+        .on_conflict_do_nothing()
+        .returning(HiddenWorkoutTemplate.template_id)
+    ).scalar_one_or_none()
+    return hidden is not None
+
+
+def materialize_template(session: Session, template: WorkoutDetail, user_id: Optional[int]) -> int:
+    """
+    Copie un template pour un user avant sa première modification et le masque pour lui.
+    Retourne l'id de la copie. Ne commit pas : à appeler dans la transaction de l'écriture.
+    """
+    if user_id is None:
+        raise ValueError("user_id is required to edit a template workout")
+    if not session.get(User, user_id):
+        raise ValueError("User not found")
+    if not _hide(session, user_id, template.id):
+        copy_id = session.execute(
+            select(Workout.id).where(Workout.user_id == user_id, Workout.template_id == template.id)
+        ).scalars().first()
+        if copy_id is None:
+            raise ValueError("Workout not found")  # template supprimé par ce user
+        return copy_id
+
+    copy_id = session.execute(
+        insert(Workout)
+        .values(name=template.name, notes=template.notes, day_of_week=template.day_of_week, user_id=user_id, template_id=template.id)
+        .returning(Workout.id)
+    ).scalar_one()
+    rows = [
+        {
+            "workout_id": copy_id,
+            "exercise_id": e.exercise_id,
+            "planned_sets": e.planned_sets,
+            "planned_reps": e.planned_reps,
+            "planned_weight": e.planned_weight,
+            "rest_seconds": e.rest_seconds,
+            "notes": e.notes,
+            "position": e.position,
+        }
+        for e in template.workout_exercises
+    ]
+    if rows:
+        session.execute(insert(WorkoutExercise), rows)
+    return copy_id
+
+
+def hide_template(session: Session, user_id: Optional[int], template_id: int) -> None:
+    """Suppression d'un template par un user : il ne le voit plus, les autres si. Ne commit pas."""
+    if user_id is None:
+        raise ValueError("user_id is required to delete a template workout")
+    if not session.get(User, user_id):
+        raise ValueError("User not found")
+    _hide(session, user_id, template_id)
+
+
+DEFAULT_WORKOUTS_DATA = [
+     
+    {
+        "key": "push-day",
+        "name": "Push day",
+        "exercises": [
+            {"name": "Barbell Bench Press", "sets": 3, "reps_str": "7", "rest": 180, "notes": "RPE 8. Fundamental movement. Full body tension, drive through the feet."},
+            {"name": "Incline Dumbbell Press", "sets": 3, "reps_str": "12", "rest": 120, "notes": "RPE 8.5. Focus on volume and hypertrophy."},
+            {"name": "Cable Crossover", "sets": 3, "reps_str": "15", "rest": 90, "notes": "RPE 9. Endurance/Metabolic Hypertrophy."},
+            {"name": "Dumbbell Lateral Raise", "sets": 3, "reps_str": "15", "rest": 60, "notes": "RPE 9. Isolate the medial deltoid. Strict movement."},
+            {"name": "Reverse Grip Triceps Pushdown", "sets": 3, "reps_str": "15", "rest": 60, "notes": "RPE 9. Focus on full extension."}, 
+            {"name": "Face Pull", "sets": 2, "reps_str": "20", "rest": 60, "notes": "RPE 7. Rotator cuff and rear delt work."},
+        ]
+    },
+    {
+        "key": "pull-day",
+        "name": "Pull day",
+        "exercises": [
+            {"name": "Pull-up", "sets": 3, "reps_str": "7", "rest": 180, "notes": "RPE 8. Back/Strength Priority. Initiate with scapulae."},
+            {"name": "Romanian Deadlift (RDL)", "sets": 3, "reps_str": "10", "rest": 150, "notes": "RPE 8. Push hips back, maintain neutral spine."},
+            {"name": "Bent-Over Barbell Row", "sets": 3, "reps_str": "12", "rest": 120, "notes": "RPE 8.5. Pull with the elbows. Contract mid-back."},
+            {"name": "Seated Cable Row", "sets": 3, "reps_str": "115", "rest": 90, "notes": "RPE 9. Back Endurance/Hypertrophy."},
+            {"name": "Standing Barbell Curl", "sets": 3, "reps_str": "15", "rest": 60, "notes": "RPE 9. Strict control, no swinging."},
+            {"name": "Hammer Curl", "sets": 2, "reps_str": "15", "rest": 60, "notes": "RPE 8. For arm thickness."},
+        ]
+    },
+    {
+        "key": "leg-day",
+        "name": "Insane leg day",
+        "exercises": [
+            {"name": "Barbell Back Squat", "sets": 3, "reps_str": "7", "rest": 180, "notes": "RPE 8. Strength Priority. Impeccable technique."},
+            {"name": "Leg Press", "sets": 3, "reps_str": "12", "rest": 120, "notes": "RPE 8.5. Hypertrophy. Control the range of motion."},
+            {"name": "Reverse Lunge", "sets": 3, "reps_str": "15", "rest": 90, "notes": "RPE 9. Stability and balance. Aim for a long step."},
+            {"name": "Leg Extension", "sets": 3, "reps_str": "20", "rest": 60, "notes": "RPE 9.5. Endurance. Hold peak contraction 1-2s."},
+            {"name": "Seated Leg Curl", "sets": 3, "reps_str": "15", "rest": 60, "notes": "RPE 9. Hamstring focus. Mind-muscle connection."},
+            {"name": "Standing Calf Raise", "sets": 3, "reps_str": "20", "rest": 60, "notes": "RPE 9.5. Maximal range of motion."},
+        ]
+    },
+    {
+        "key": "full-body",
+        "name": "Full body",
+        "exercises": [
+            {"name": "Hack Squat", "sets": 2, "reps_str": "20", "rest": 90, "notes": "RPE 7.5. Light load. Controlled but quick tempo."},
+            {"name": "Lat Pulldown", "sets": 2, "reps_str": "20", "rest": 60, "notes": "RPE 7.5. Focus on tempo and feel."},
+            {"name": "Push-up", "sets": 2, "reps_str": "20", "rest": 60, "notes": "RPE 7.5. Focus on explosive pushing."},
+            {"name": "Walking Lunge", "sets": 2, "reps_str": "20", "rest": 60, "notes": "RPE 7. Mobility and endurance."},
+            {"name": "Standing Barbell Curl", "sets": 2, "reps_str": "15", "rest": 45, "notes": "RPE 7. Light "}, 
+        ]
+    },
+]
\ No newline at end of file
@@ -1,14 +1,19 @@
 from typing import List, Optional, Tuple
 from sqlmodel import select, func
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import datetime 
 from app.database.db import get_session
+from app.database.cache import bump_version
 from app.models.base import Workout, User  # User pour check FK
-from app.schemas.workouts import WorkoutCreate, WorkoutUpdate, WorkoutOut
-from .workout_exercises import WorkoutExerciseCreate
-from app.models.base import Workout, WorkoutExercise, Exercise
+from app.schemas.workouts import WorkoutCreate, WorkoutUpdate, WorkoutOut, WorkoutDetail
+from app.models.base import Workout, WorkoutExercise, Exercise, UserExerciseLog
+from app.crud.personal_records import refresh_exercise_records
+from app.crud.exercises import get_catalog
+from app.crud.pagination import decode_cursor
+from app.crud.workout_templates import get_templates, hide_template, materialize_template, visible_template_ids
 from sqlmodel import select, delete
-import logging  
+from sqlalchemy import insert, or_, update
 
 def create_workout(workout_in: WorkoutCreate, session: Session) -> WorkoutOut:
     owner = session.get(User, workout_in.user_id)
@@ -25,177 +30,210 @@ def create_workout(workout_in: WorkoutCreate, session: Session) -> WorkoutOut:
     session.add(db_workout)
     session.commit()
     session.refresh(db_workout)  
+    bump_version("user", db_workout.user_id)
     return WorkoutOut.model_validate(db_workout)
 
-def get_workout(workout_id: int, session: Session) -> Optional[WorkoutOut]:
-    workout = session.get(Workout, workout_id)
+def _workout_detail_query():
+    # selectinload : 1 requête pour les workouts, 1 pour leurs exercices, 1 pour le catalogue,
+    # quelle que soit la taille de la page
+    return select(Workout).options(
+        selectinload(Workout.workout_exercises).selectinload(WorkoutExercise.exercise)
+    )
+
+def get_workout(workout_id: int, session: Session) -> Optional[WorkoutDetail]:
+    template = get_templates(session).by_id.get(workout_id)
+    if template:
+        return template
+    workout = session.exec(_workout_detail_query().where(Workout.id == workout_id)).first()
     if workout:
-        return WorkoutOut.model_validate(workout)
+        return WorkoutDetail.model_validate(workout)
     return None
 
-def get_workouts(
-    session: Session, offset: int, limit: int, user_id: Optional[int] = None
-) -> Tuple[List[WorkoutOut], int]:
-    
+def _workouts_page_queries(offset: int, limit: int, user_id: Optional[int], cursor: Optional[str] = None, template_ids: List[int] = ()):
+    # Workouts du user + templates partagés qu'il voit encore
+    owned = or_(Workout.user_id == user_id, Workout.id.in_(template_ids)) if template_ids else Workout.user_id == user_id
     count_statement = select(func.count(Workout.id))
     if user_id:
-        count_statement = count_statement.where(Workout.user_id == user_id)
-    
-    total = session.exec(count_statement).one()
+        count_statement = count_statement.where(owned)
 
-    data_statement = select(Workout).offset(offset).limit(limit)
+    data_statement = _workout_detail_query().order_by(Workout.id).offset(offset).limit(limit)
     if user_id:
-        data_statement = data_statement.where(Workout.user_id == user_id)
+        data_statement = data_statement.where(owned)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        data_statement = data_statement.where(Workout.id > last_id)
+    return count_statement, data_statement
 
+def get_workouts(
+    session: Session, offset: int, limit: int, user_id: Optional[int] = None,
+    cursor: Optional[str] = None, with_total: bool = True,
+) -> Tuple[List[WorkoutDetail], Optional[int]]:
+    # with_total=False évite le count(*) à chaque page (pagination par curseur)
+    template_ids = visible_template_ids(session, user_id) if user_id else []
+    count_statement, data_statement = _workouts_page_queries(offset, limit, user_id, cursor, template_ids)
+
+    total = session.exec(count_statement).one() if with_total else None
     workouts_db = session.exec(data_statement).all()
     
-    workouts_out = [WorkoutOut.model_validate(w) for w in workouts_db]
+    workouts_out = [WorkoutDetail.model_validate(w) for w in workouts_db]
 
     return workouts_out, total
 
-def update_workout(workout_id: int, workout_update: WorkoutUpdate, session: Session) -> Optional[WorkoutOut]:
-    db_workout = session.get(Workout, workout_id)
-    if not db_workout:
-        return None
-
-    # On extrait les données du payload. exclude_unset=True est important.
-    update_data = workout_update.model_dump(exclude_unset=True)
-
-    # 1. Gérer la mise à jour des exercices, s'ils sont fournis
-    if "exercises" in update_data:
-        new_exercises_data = update_data.pop("exercises") # On les retire pour le traitement
-
-        # a. Supprimer tous les anciens exercices liés à ce workout
-        delete_statement = delete(WorkoutExercise).where(WorkoutExercise.workout_id == workout_id)
-        session.exec(delete_statement)
-
-        # b. Ajouter les nouveaux exercices
-        for exercise_in in new_exercises_data:
-            # On peut utiliser model_validate pour convertir le dict en Pydantic model si besoin
-            ex_model = WorkoutExerciseCreate.model_validate(exercise_in)
-            db_exercise = WorkoutExercise(
-                workout_id=workout_id,
-                **ex_model.model_dump()
-            )
-            session.add(db_exercise)
-
-    # 2. Mettre à jour les champs simples du workout (name, notes, etc.)
-    for key, value in update_data.items():
-        setattr(db_workout, key, value)
-    
-    session.add(db_workout)
-    session.commit()
+# --- Variantes async (DB_ASYNC) : mêmes requêtes, selectinload reste compatible asyncpg ---
+
+async def get_workout_async(workout_id: int, session: AsyncSession) -> Optional[WorkoutDetail]:
+    template = (await session.run_sync(get_templates)).by_id.get(workout_id)
+    if template:
+        return template
+    workout = (await session.exec(_workout_detail_query().where(Workout.id == workout_id))).first()
+    return WorkoutDetail.model_validate(workout) if workout else None
+
+async def get_workouts_async(
+    session: AsyncSession, offset: int, limit: int, user_id: Optional[int] = None,
+    cursor: Optional[str] = None, with_total: bool = True,
+) -> Tuple[List[WorkoutDetail], Optional[int]]:
+    template_ids = await session.run_sync(visible_template_ids, user_id) if user_id else []
+    count_statement, data_statement = _workouts_page_queries(offset, limit, user_id, cursor, template_ids)
+    total = (await session.exec(count_statement)).one() if with_total else None
+    workouts_db = (await session.exec(data_statement)).all()
+    return [WorkoutDetail.model_validate(w) for w in workouts_db], total
+
+async def get_workout_for_day_async(user_id: int, day_of_week: int, session: AsyncSession) -> Optional[WorkoutDetail]:
+    workout = (await session.exec(
+        _workout_detail_query().where(Workout.user_id == user_id, Workout.day_of_week == day_of_week)
+    )).first()
+    return WorkoutDetail.model_validate(workout) if workout else None
+
+PLAN_COLUMNS = ("exercise_id", "planned_sets", "planned_reps", "planned_weight", "rest_seconds", "notes", "position")
+
+def diff_workout_plan(existing: List[dict], plan: List[dict]) -> Tuple[List[dict], List[dict], List[int]]:
+    """
+    Compare le plan envoyé aux lignes workout_exercises existantes (dicts, dans l'ordre).
+    Une ligne du plan reprend la ligne existante de même `id`, sinon la première ligne
+    libre du même exercice. Retourne (à insérer, à mettre à jour, ids à supprimer) :
+    les lignes inchangées gardent leur id et ne sont pas réécrites.
+    """
+    by_id = {row["id"]: row for row in existing}
+    requested = [item["id"] for item in plan if item.get("id") is not None]
+    unknown = [i for i in requested if i not in by_id]
+    if unknown:
+        raise ValueError(f"Workout exercise not found: {', '.join(map(str, unknown))}")
+    if len(set(requested)) != len(requested):
+        raise ValueError("Duplicate workout exercise id in plan")
+
+    free = {}
+    for row in existing:
+        if row["id"] not in requested:
+            free.setdefault(row["exercise_id"], []).append(row)
+
+    inserts, updates, kept = [], [], set()
+    for position, item in enumerate(plan):
+        values = {column: item.get(column) for column in PLAN_COLUMNS}
+        values["position"] = position
+        if item.get("id") is not None:
+            row = by_id[item["id"]]
+        else:
+            candidates = free.get(values["exercise_id"])
+            row = candidates.pop(0) if candidates else None
+        if row is None:
+            inserts.append(values)
+            continue
+        kept.add(row["id"])
+        if any(row[column] != values[column] for column in PLAN_COLUMNS):
+            updates.append({"id": row["id"], **values})
+    deletes = [row["id"] for row in existing if row["id"] not in kept]
+    return inserts, updates, deletes
+
+def _apply_workout_plan(session: Session, workout_id: int, plan: List[dict]) -> None:
+    catalog = get_catalog(session)
+    missing = sorted({item["exercise_id"] for item in plan} - set(catalog.by_id))
+    if missing:
+        raise ValueError(f"Exercise not found: {', '.join(map(str, missing))}")
+
+    existing = session.execute(
+        select(WorkoutExercise.id, *(getattr(WorkoutExercise, c) for c in PLAN_COLUMNS))
+        .where(WorkoutExercise.workout_id == workout_id)
+        .order_by(WorkoutExercise.position, WorkoutExercise.id)
+    ).mappings().all()
+    inserts, updates, deletes = diff_workout_plan([dict(r) for r in existing], plan)
+
+    # Au plus 3 requêtes, quelle que soit la taille du plan
+    if deletes:
+        session.execute(delete(WorkoutExercise).where(WorkoutExercise.id.in_(deletes)))
+    if updates:
+        session.execute(update(WorkoutExercise), updates)  # UPDATE par clé primaire, en executemany
+    if inserts:
+        session.execute(insert(WorkoutExercise), [{"workout_id": workout_id, **values} for values in inserts])
+
+def update_workout(workout_id: int, workout_update: WorkoutUpdate, session: Session, user_id: int) -> Optional[WorkoutOut]:
+    template = get_templates(session).by_id.get(workout_id)
+    try:
+        if template:
+            # Copy-on-write : la modification porte sur la copie du user, le template ne change pas
+            workout_id = materialize_template(session, template, user_id)
+        # FOR UPDATE : deux éditions concurrentes du même plan ne calculent pas leur diff sur le même état
+        db_workout = session.get(Workout, workout_id, with_for_update=True)
+        if not db_workout or db_workout.user_id != user_id:
+            # Le workout d'un autre user est traité comme absent (404), sans garder le verrou
+            session.rollback()
+            return None
+
+        # On extrait les données du payload. exclude_unset=True est important.
+        update_data = workout_update.model_dump(exclude_unset=True)
+
+        # 1. Appliquer le plan d'exercices, s'il est fourni, par différence avec l'existant
+        plan = update_data.pop("exercises", None)
+        if plan is not None:
+            if template:
+                # Les ids envoyés sont ceux des lignes du template : la copie est appariée par exercice
+                template_rows = {e.id for e in template.workout_exercises}
+                plan = [{**item, "id": None} if item.get("id") in template_rows else item for item in plan]
+            _apply_workout_plan(session, workout_id, plan)
+
+        # 2. Mettre à jour les champs simples du workout (name, notes, etc.)
+        for key, value in update_data.items():
+            setattr(db_workout, key, value)
+
+        session.add(db_workout)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
     session.refresh(db_workout)
+    bump_version("user", db_workout.user_id)
+    bump_version("workout", workout_id)
     
     return WorkoutOut.model_validate(db_workout)
 
 
-def get_workout_for_day(user_id: int, day_of_week: int, session: Session) -> Optional[WorkoutOut]:
+def get_workout_for_day(user_id: int, day_of_week: int, session: Session) -> Optional[WorkoutDetail]:
     workout_db = session.exec(
-        select(Workout).where(Workout.user_id == user_id, Workout.day_of_week == day_of_week)
+        _workout_detail_query().where(Workout.user_id == user_id, Workout.day_of_week == day_of_week)
     ).first()
     
     if workout_db:
-        return WorkoutOut.model_validate(workout_db)
+        return WorkoutDetail.model_validate(workout_db)
     return None
 
-def delete_workout(workout_id: int, session: Session) -> bool:
+def delete_workout(workout_id: int, session: Session, user_id: int) -> bool:
+    if workout_id in get_templates(session).by_id:
+        # Un template partagé n'est jamais supprimé : il est seulement masqué pour ce user
+        hide_template(session, user_id, workout_id)
+        session.commit()
+        bump_version("user", user_id)
+        return True
     workout = session.get(Workout, workout_id)
-    if not workout:
-        return False
+    if not workout or workout.user_id != user_id:
+        return False  # seul le propriétaire supprime (et perd ses logs) : sinon 404
+    # Les logs du workout partent en cascade : les records qui en dépendaient sont recalculés
+    logged_exercise_ids = session.exec(
+        select(UserExerciseLog.exercise_id).where(UserExerciseLog.workout_id == workout_id).distinct()
+    ).all()
     session.delete(workout)
+    session.flush()
+    for exercise_id in logged_exercise_ids:
+        refresh_exercise_records(session, user_id, exercise_id)
     session.commit()
+    bump_version("user", user_id)
+    bump_version("workout", workout_id)
     return True
-
-
-def create_default_workouts(db: Session, user_id: int):
-    """
-    Crée les 4 workouts de base pour un nouvel utilisateur.
-    """
-    
-    all_exercises_query = db.exec(select(Exercise)).all()
-    exercise_map = {ex.name: ex.id for ex in all_exercises_query}
-
-    objects_to_add = [] 
-
-    for workout_data in DEFAULT_WORKOUTS_DATA:
-        new_workout = Workout(
-            name=workout_data["name"],
-            user_id=user_id
-        )
-        objects_to_add.append(new_workout)
-
-        for ex_data in workout_data["exercises"]:
-            ex_name = ex_data["name"]
-            
-            exercise_id = exercise_map.get(ex_name)
-            
-            if not exercise_id:
-                logging.warning(f"Exercice de base '{ex_name}' non trouvé dans la BDD. Il ne sera pas ajouté au workout par défaut.")
-                continue
-
-            new_link = WorkoutExercise(
-                workout=new_workout, 
-                exercise_id=exercise_id,
-                planned_sets=ex_data["sets"],
-                planned_reps=ex_data["reps_str"],
-                rest_seconds=ex_data["rest"],
-                notes=ex_data["notes"]
-            )
-            objects_to_add.append(new_link)
-
-    try:
-        db.add_all(objects_to_add)
-        db.commit()
-        logging.info(f"Workouts de base créés avec succès pour l'utilisateur {user_id}")
-    except Exception as e:
-        db.rollback() 
-        logging.error(f"Erreur lors de la création des workouts de base pour {user_id}: {e}")
-
-
-DEFAULT_WORKOUTS_DATA = [
-     
-    {
-        "name": "Push day",
-        "exercises": [
-            {"name": "Barbell Bench Press", "sets": 3, "reps_str": "7", "rest": 180, "notes": "RPE 8. Fundamental movement. Full body tension, drive through the feet."},
-            {"name": "Incline Dumbbell Press", "sets": 3, "reps_str": "12", "rest": 120, "notes": "RPE 8.5. Focus on volume and hypertrophy."},
-            {"name": "Cable Crossover", "sets": 3, "reps_str": "15", "rest": 90, "notes": "RPE 9. Endurance/Metabolic Hypertrophy."},
-            {"name": "Dumbbell Lateral Raise", "sets": 3, "reps_str": "15", "rest": 60, "notes": "RPE 9. Isolate the medial deltoid. Strict movement."},
-            {"name": "Reverse Grip Triceps Pushdown", "sets": 3, "reps_str": "15", "rest": 60, "notes": "RPE 9. Focus on full extension."}, 
-            {"name": "Face Pull", "sets": 2, "reps_str": "20", "rest": 60, "notes": "RPE 7. Rotator cuff and rear delt work."},
-        ]
-    },
-    {
-        "name": "Pull day",
-        "exercises": [
-            {"name": "Pull-up", "sets": 3, "reps_str": "7", "rest": 180, "notes": "RPE 8. Back/Strength Priority. Initiate with scapulae."},
-            {"name": "Romanian Deadlift (RDL)", "sets": 3, "reps_str": "10", "rest": 150, "notes": "RPE 8. Push hips back, maintain neutral spine."},
-            {"name": "Bent-Over Barbell Row", "sets": 3, "reps_str": "12", "rest": 120, "notes": "RPE 8.5. Pull with the elbows. Contract mid-back."},
-            {"name": "Seated Cable Row", "sets": 3, "reps_str": "115", "rest": 90, "notes": "RPE 9. Back Endurance/Hypertrophy."},
-            {"name": "Standing Barbell Curl", "sets": 3, "reps_str": "15", "rest": 60, "notes": "RPE 9. Strict control, no swinging."},
-            {"name": "Hammer Curl", "sets": 2, "reps_str": "15", "rest": 60, "notes": "RPE 8. For arm thickness."},
-        ]
-    },
-    {
-        "name": "Insane leg day",
-        "exercises": [
-            {"name": "Barbell Back Squat", "sets": 3, "reps_str": "7", "rest": 180, "notes": "RPE 8. Strength Priority. Impeccable technique."},
-            {"name": "Leg Press", "sets": 3, "reps_str": "12", "rest": 120, "notes": "RPE 8.5. Hypertrophy. Control the range of motion."},
-            {"name": "Reverse Lunge", "sets": 3, "reps_str": "15", "rest": 90, "notes": "RPE 9. Stability and balance. Aim for a long step."},
-            {"name": "Leg Extension", "sets": 3, "reps_str": "20", "rest": 60, "notes": "RPE 9.5. Endurance. Hold peak contraction 1-2s."},
-            {"name": "Seated Leg Curl", "sets": 3, "reps_str": "15", "rest": 60, "notes": "RPE 9. Hamstring focus. Mind-muscle connection."},
-            {"name": "Standing Calf Raise", "sets": 3, "reps_str": "20", "rest": 60, "notes": "RPE 9.5. Maximal range of motion."},
-        ]
-    },
-    {
-        "name": "Full body",
-        "exercises": [
-            {"name": "Hack Squat", "sets": 2, "reps_str": "20", "rest": 90, "notes": "RPE 7.5. Light load. Controlled but quick tempo."},
-            {"name": "Lat Pulldown", "sets": 2, "reps_str": "20", "rest": 60, "notes": "RPE 7.5. Focus on tempo and feel."},
-            {"name": "Push-up", "sets": 2, "reps_str": "20", "rest": 60, "notes": "RPE 7.5. Focus on explosive pushing."},
-            {"name": "Walking Lunge", "sets": 2, "reps_str": "20", "rest": 60, "notes": "RPE 7. Mobility and endurance."},
-            {"name": "Standing Barbell Curl", "sets": 2, "reps_str": "15", "rest": 45, "notes": "RPE 7. Light "}, 
-        ]
-    },
-]
\ No newline at end of file
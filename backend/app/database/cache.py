@@ -0,0 +1,250 @@
+import json
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+import anyio
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "jymbro"
+CATALOG_SCOPE = ("catalog", 0)  # pour depends_on : les réponses qui embarquent des exercices
+
+
+class InMemoryBackend:
+    """Backend process-local (dev, tests). Les versions ne sont jamais évincées."""
+
+    blocking = False  # dict + verrou : appelé directement, même depuis la boucle async
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._entries = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if key in self._versions:
+                return str(self._versions[key]).encode()
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._evict()
+            self._entries[key] = (value, time.monotonic() + ttl if ttl else None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            return self._versions[key]
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        expired = [k for k, (_, exp) in self._entries.items() if exp is not None and exp < now]
+        for key in expired:
+            del self._entries[key]
+        # Toujours plein : on retire la plus ancienne entrée (ordre d'insertion)
+        if len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+
+class RedisBackend:
+    """Accepte tout client compatible redis.Redis (redis-py, fakeredis.FakeRedis)."""
+
+    blocking = True  # client sync : aller-retour réseau, hors de la boucle async
+
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        self.client.set(key, value, ex=ttl)
+
+    def incr(self, key: str) -> int:
+        return self.client.incr(key)
+
+
+_backend = None
+_initialized = False
+
+
+def _build_backend():
+    if settings.CACHE_BACKEND == "redis":
+        import redis
+        return RedisBackend(redis.Redis.from_url(settings.REDIS_URL))
+    if settings.CACHE_BACKEND == "memory":
+        return InMemoryBackend()
+    return None
+
+
+def get_cache():
+    global _backend, _initialized
+    if not _initialized:
+        _backend = _build_backend()
+        _initialized = True
+    return _backend
+
+
+def set_cache_backend(backend) -> None:
+    """Remplace le backend (tests : InMemoryBackend() ou RedisBackend(fakeredis.FakeRedis()))."""
+    global _backend, _initialized
+    _backend = backend
+    _initialized = True
+
+
+async def run_cache_io(fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Appelle `fn` (qui parle au backend) depuis du code async : dans le threadpool si le
+    backend est bloquant (Redis, ou backend inconnu), directement pour le backend en mémoire.
+    """
+    if getattr(get_cache(), "blocking", True):
+        return await anyio.to_thread.run_sync(fn, *args)
+    return fn(*args)
+
+
+def _version_key(scope: str, scope_id: Any) -> str:
+    return f"{KEY_PREFIX}:ver:{scope}:{scope_id}"
+
+
+def bump_version(scope: str, scope_id: Any = 0) -> None:
+    """
+    Invalide toutes les réponses en cache d'un scope ("user", "workout", "catalog") :
+    les clés incluent la version, les anciennes entrées ne sont plus jamais lues
+    et expirent d'elles-mêmes. À appeler après le commit d'une écriture.
+    """
+    backend = get_cache()
+    if backend is None:
+        return
+    try:
+        backend.incr(_version_key(scope, scope_id))
+    except Exception as e:
+        logger.warning(f"Cache invalidation failed for {scope}:{scope_id}: {e}")
+
+
+def get_version(scope: str, scope_id: Any = 0) -> Optional[str]:
+    """Version partagée d'un scope, ou None sans backend (ou si le cache est indisponible)."""
+    backend = get_cache()
+    if backend is None:
+        return None
+    try:
+        version = backend.get(_version_key(scope, scope_id))
+    except Exception as e:
+        logger.warning(f"Cache version read failed for {scope}:{scope_id}: {e}")
+        return None
+    return version.decode() if isinstance(version, bytes) else (version or "0")
+
+
+def _lookup(namespace: str, scope: str, scope_id: Any, params: dict, depends_on: Sequence[Tuple[str, Any]] = ()):
+    """Retourne (réponse en cache ou None, clé où stocker le résultat ou None)."""
+    key = None
+    try:
+        # Version du scope principal, puis de chaque scope dont le contenu est embarqué
+        # (ex. le catalogue dans un workout) : une écriture sur l'un d'eux change la clé
+        parts = []
+        for dep_scope, dep_id in ((scope, scope_id), *depends_on):
+            version = get_version(dep_scope, dep_id)
+            if version is None:
+                raise RuntimeError("version unavailable")
+            parts.append(f"v{version}" if not parts else f"{dep_scope}.{dep_id}.v{version}")
+        suffix = ":".join(f"{k}={params[k]}" for k in sorted(params))
+        key = ":".join([KEY_PREFIX, "resp", namespace, scope, str(scope_id), *parts, suffix])
+        hit = get_cache().get(key)
+        if hit is not None:
+            return _response(*_unpack(hit), "HIT"), key
+    except Exception as e:
+        logger.warning(f"Cache read failed for {namespace}: {e}")
+        key = None
+    return None, key
+
+
+def _store(namespace: str, key: Optional[str], data: Any, ttl: Optional[int]) -> Response:
+    status_code, headers, body = _entry(data)
+    if key is not None:
+        try:
+            get_cache().set(key, _pack(status_code, headers, body), ttl or settings.CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"Cache write failed for {namespace}: {e}")
+    return _response(status_code, headers, body, "MISS")
+
+
+def cached_json(
+    namespace: str,
+    scope: str,
+    scope_id: Any,
+    params: dict,
+    loader: Callable[[], Any],
+    ttl: Optional[int] = None,
+    depends_on: Sequence[Tuple[str, Any]] = (),
+) -> Any:
+    """
+    Sert la réponse JSON depuis le cache si la version du scope (et des scopes
+    `depends_on`) n'a pas bougé, sinon appelle `loader`, sérialise et stocke le
+    résultat. Une panne du cache ne fait jamais échouer la requête : on retombe sur `loader`.
+    """
+    if get_cache() is None:
+        return loader()
+    hit, key = _lookup(namespace, scope, scope_id, params, depends_on)
+    if hit is not None:
+        return hit
+    return _store(namespace, key, loader(), ttl)
+
+
+async def cached_json_async(
+    namespace: str,
+    scope: str,
+    scope_id: Any,
+    params: dict,
+    loader: Callable[[], Awaitable[Any]],
+    ttl: Optional[int] = None,
+    depends_on: Sequence[Tuple[str, Any]] = (),
+) -> Any:
+    """Variante de `cached_json` pour les routes async : `loader` est une coroutine."""
+    if get_cache() is None:
+        return await loader()
+    hit, key = await run_cache_io(_lookup, namespace, scope, scope_id, params, depends_on)
+    if hit is not None:
+        return hit
+    data = await loader()
+    return await run_cache_io(_store, namespace, key, data, ttl)
+
+
+def _entry(data: Any) -> Tuple[int, Dict[str, str], bytes]:
+    if isinstance(data, Response):
+        # Réponse déjà sérialisée par la route (chemin rapide de app/routers/responses.py) :
+        # ses headers (ex. X-Next-Cursor) font partie de la réponse, on les garde
+        headers = {k: v for k, v in data.headers.items() if k not in ("content-length", "content-type")}
+        return data.status_code, headers, data.body
+    return 200, {}, json.dumps(jsonable_encoder(data)).encode()
+
+
+def _pack(status_code: int, headers: Dict[str, str], body: bytes) -> bytes:
+    # Entrée de cache : une ligne JSON (statut, headers) puis le corps tel quel
+    return json.dumps({"status": status_code, "headers": headers}).encode() + b"\n" + body
+
+
+def _unpack(entry: bytes) -> Tuple[int, Dict[str, str], bytes]:
+    meta, body = entry.split(b"\n", 1)
+    meta = json.loads(meta)
+    return meta["status"], meta["headers"], body
+
+
+def _response(status_code: int, headers: Dict[str, str], body: bytes, cache_status: str) -> Response:
+    return Response(
+        content=body,
+        status_code=status_code,
+        media_type="application/json",
+        headers={**headers, "X-Cache": cache_status},
+    )
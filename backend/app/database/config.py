@@ -11,12 +11,60 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
     SECRET_KEY: str
+    POSTGRES_HOST: str = "db"
+    POSTGRES_PORT: int = 5432
     ALLOW_ORIGINS: str
 
+    # Cache des réponses de lecture : "none", "memory" (un seul process) ou "redis"
+    CACHE_BACKEND: str = "none"
+    REDIS_URL: str = "redis://redis:6379/0"
+    CACHE_TTL_SECONDS: int = 300
+
+    # Pool de connexions (par process) : workers × (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    # doit rester sous max_connections de Postgres (ou max_client_conn de PgBouncer)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800  # secondes, -1 pour désactiver
+    DB_POOL_PRE_PING: bool = True  # ping à chaque checkout ; False si recycle suffit
+    # PgBouncer en transaction pooling devant Postgres (désactive les prepared statements asyncpg)
+    DB_PGBOUNCER: bool = False
+
+    # Cache du user authentifié (secondes, 0 pour désactiver) et nombre d'entrées par process
+    PRINCIPAL_CACHE_TTL: int = 30
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+
+    # Argon2 : changer ces paramètres fait re-hacher les mots de passe au prochain login
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+    # Pool de process dédié au hachage (0 = inline) et nombre max d'opérations en cours
+    # avant de répondre 503 ; à garder sous la taille du threadpool (40 par défaut)
+    HASH_WORKERS: int = 2
+    HASH_MAX_PENDING: int = 16
+
+    # Pile async (asyncpg) pour les endpoints chauds ; sinon tout passe par psycopg2
+    DB_ASYNC: bool = False
+
+    # Serveur HTTP : "dev" (uvicorn --reload, un seul process) ou "production"
+    # (gunicorn + workers uvicorn, app préchargée dans le master avant le fork)
+    SERVER_MODE: str = "dev"
+    WEB_PORT: int = 8000
+    WEB_WORKERS: int = 0  # 0 = un worker par CPU disponible pour le container
+    WEB_GRACEFUL_TIMEOUT: int = 30  # secondes laissées aux requêtes en cours à l'arrêt
+    WEB_KEEPALIVE: int = 5
+
+    # Métriques Prometheus par requête sur /metrics (à ne pas exposer publiquement via le proxy)
+    METRICS_ENABLED: bool = True
+
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
         driver = "psycopg2" 
-        return f"postgresql+{driver}://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@db:5432/{self.POSTGRES_DB}"
+        return f"postgresql+{driver}://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> str:
+        return self.SQLALCHEMY_DATABASE_URI.replace("+psycopg2", "+asyncpg", 1)
 
     model_config = SettingsConfigDict(
         env_file=".env.dev" if ENVIRONMENT == "development" else ".env.prod",
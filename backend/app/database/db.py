@@ -1,11 +1,29 @@
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
 from .config import settings
+from .pool import engine_options, instrument
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, **engine_options())
+instrument(engine)
+
+# Moteur asyncpg, créé seulement si la pile async est activée (DB_ASYNC)
+async_engine = (
+    create_async_engine(settings.SQLALCHEMY_ASYNC_DATABASE_URI, **engine_options(is_async=True))
+    if settings.DB_ASYNC
+    else None
+)
+if async_engine is not None:
+    instrument(async_engine.sync_engine)
 
 def get_session():
     with Session(engine) as session:
         yield session
 
+async def get_async_session():
+    # expire_on_commit=False : pas de lazy-load implicite (impossible en async) après un commit
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
\ No newline at end of file
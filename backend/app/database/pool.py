@@ -0,0 +1,144 @@
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from .config import settings
+
+# Métriques du pool de connexions, pour dimensionner workers × (pool_size + max_overflow)
+# face au max_connections de Postgres (ou de PgBouncer).
+
+WAIT_SAMPLES = 1000  # fenêtre glissante pour les percentiles d'attente
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.peak_checked_out = 0
+
+    def record_wait(self, seconds: float, checked_out: int, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self._waits.append(seconds)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def count(self, attribute: str) -> None:
+        with self._lock:
+            setattr(self, attribute, getattr(self, attribute) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms": {
+                    "mean": round(self.wait_total / attempts * 1000, 3) if attempts else 0.0,
+                    "p95": round(waits[int(len(waits) * 0.95)] * 1000, 3) if waits else 0.0,
+                    "max": round(self.wait_max * 1000, 3),
+                },
+                "peak_checked_out": self.peak_checked_out,
+                "connects": self.connects,
+                "closes": self.closes,
+                "invalidations": self.invalidations,
+            }
+
+
+class _TimedPoolMixin:
+    """Mesure le temps passé à obtenir une connexion (attente + éventuelle ouverture)."""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_wait(time.perf_counter() - start, self.checkedout(), timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - start, self.checkedout())
+        return connection
+
+    def recreate(self):
+        # engine.dispose() remplace le pool : les compteurs continuent sur le nouveau
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(is_async: bool = False) -> dict:
+    """Arguments de create_engine / create_async_engine issus de Settings."""
+    options = {
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if settings.DB_PGBOUNCER and is_async:
+        # PgBouncer en transaction pooling : une transaction peut changer de connexion
+        # serveur, donc pas de prepared statements nommés/cachés côté asyncpg
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+    return options
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4().hex}__"
+
+
+def instrument(engine) -> None:
+    """Attache les compteurs de churn au pool et rend ses métriques accessibles."""
+    pool = engine.pool
+    pool.metrics = PoolMetrics()
+    event.listen(pool, "connect", lambda *args: pool.metrics.count("connects"))
+    event.listen(pool, "close", lambda *args: pool.metrics.count("closes"))
+    event.listen(pool, "close_detached", lambda *args: pool.metrics.count("closes"))
+    event.listen(pool, "invalidate", lambda *args: pool.metrics.count("invalidations"))
+
+
+def pool_stats(engine) -> Optional[dict]:
+    if engine is None:
+        return None
+    pool = engine.pool
+    capacity = pool.size() + max(settings.DB_MAX_OVERFLOW, 0)
+    checked_out = pool.checkedout()
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "capacity": capacity,
+        "checked_out": checked_out,
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "saturation": round(checked_out / capacity, 3) if capacity else None,
+        **pool.metrics.snapshot(),
+    }
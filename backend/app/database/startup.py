@@ -0,0 +1,143 @@
+import hashlib
+import json
+import logging
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import FrozenSet, Optional, Tuple
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from app.database.cache import bump_version
+from app.database.config import settings
+from app.crud.exercises import catalog_version_bump
+from app.crud.workout_templates import DEFAULT_WORKOUTS_DATA, create_missing_templates
+from app.models.base import AppState
+
+# Préparation de la base au démarrage d'un container (entrypoint.sh) :
+# - chemin rapide : révision alembic et checksum du seed déjà à jour, trois SELECT et on sort ;
+# - sinon une seule réplique migre et seede (catalogue puis workouts de base), sous verrou
+#   consultatif Postgres ; les autres attendent le verrou puis constatent que tout est fait.
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+SEED_FILE = BACKEND_DIR / "seed_exercises.sql"
+SEED_CHECKSUM_KEY = "seed_exercises_sha256"
+STARTUP_LOCK_ID = 7_310_524_001  # clé arbitraire, la même pour toutes les répliques
+
+State = Tuple[Optional[str], Optional[str]]  # (révision alembic, checksum du seed appliqué)
+
+
+@lru_cache(maxsize=None)
+def alembic_config() -> Config:
+    # Sans alembic.ini : env.py ne refait pas fileConfig(), qui couperait les loggers du process
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    return config
+
+
+@lru_cache(maxsize=None)
+def _script() -> Tuple[str, FrozenSet[str]]:
+    script = ScriptDirectory.from_config(alembic_config())
+    return script.get_current_head(), frozenset(r.revision for r in script.walk_revisions())
+
+
+def head_revision() -> str:
+    return _script()[0]
+
+
+@lru_cache(maxsize=None)
+def seed_checksum() -> str:
+    # Couvre le catalogue et les workouts de base qui en dépendent : modifier l'un ou
+    # l'autre rejoue tout le seed, idempotent
+    digest = hashlib.sha256(SEED_FILE.read_bytes())
+    digest.update(json.dumps(DEFAULT_WORKOUTS_DATA, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def read_state(conn: Connection) -> State:
+    # Base neuve : ni alembic_version ni app_state n'existent encore
+    has_version, has_state = conn.execute(
+        text("SELECT to_regclass('alembic_version') IS NOT NULL, to_regclass('app_state') IS NOT NULL")
+    ).one()
+    revision = conn.execute(text("SELECT version_num FROM alembic_version")).scalar() if has_version else None
+    checksum = (
+        conn.execute(text("SELECT value FROM app_state WHERE key = :key"), {"key": SEED_CHECKSUM_KEY}).scalar()
+        if has_state else None
+    )
+    return revision, checksum
+
+
+def schema_ready(revision: Optional[str]) -> bool:
+    # Une révision inconnue de ce code vient d'un déploiement plus récent (migrations
+    # rétrocompatibles) : le schéma n'est pas en retard
+    head, known = _script()
+    return revision is not None and (revision == head or revision not in known)
+
+
+def _seed(conn: Connection) -> Tuple[int, int]:
+    # Le seed est un unique INSERT ... VALUES : rejoué avec ON CONFLICT, il n'ajoute que
+    # les exercices absents (nom unique) et ne touche pas aux lignes existantes ; de même
+    # pour les templates (template_key unique), créés ensuite à partir du catalogue
+    seed_sql = SEED_FILE.read_text().rstrip().rstrip(";")
+    inserted = conn.exec_driver_sql(f"{seed_sql} ON CONFLICT (name) DO NOTHING").rowcount
+    with Session(bind=conn) as session:
+        templates = create_missing_templates(session)
+    if inserted or templates:
+        # Snapshots catalogue et templates des workers déjà lancés (déploiement progressif)
+        conn.execute(catalog_version_bump())
+    conn.execute(
+        pg_insert(AppState)
+        .values(key=SEED_CHECKSUM_KEY, value=seed_checksum(), updated_at=func.now())
+        .on_conflict_do_update(index_elements=["key"], set_={"value": seed_checksum(), "updated_at": func.now()})
+    )
+    return inserted, templates
+
+
+def prepare() -> None:
+    """
+    Amène la base à la révision head et au seed courant. Idempotent : sans rien à faire,
+    ne prend pas le verrou et ne rejoue pas le seed.
+    """
+    start = time.perf_counter()
+    engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, poolclass=NullPool)
+    try:
+        with engine.connect() as conn:
+            revision, checksum = read_state(conn)
+        if schema_ready(revision) and checksum == seed_checksum():
+            logger.info(f"Database up to date ({revision}), nothing to do ({time.perf_counter() - start:.2f}s)")
+            return
+
+        # Verrou transactionnel : libéré au commit (ou si le process meurt), et compatible
+        # avec PgBouncer en transaction pooling, contrairement au verrou de session
+        with engine.begin() as lock:
+            if not lock.execute(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": STARTUP_LOCK_ID}).scalar():
+                logger.info("Another replica is preparing the database, waiting for the lock...")
+                lock.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": STARTUP_LOCK_ID})
+            # Relu sous verrou, sur une autre connexion : la transaction du verrou ne doit
+            # garder aucun verrou de table pendant les migrations
+            with engine.connect() as conn:
+                revision, checksum = read_state(conn)
+            if not schema_ready(revision):
+                logger.info(f"Running migrations {revision} -> {head_revision()}")
+                command.upgrade(alembic_config(), "head")  # connexion propre à env.py
+            inserted = templates = 0
+            if checksum != seed_checksum():
+                inserted, templates = _seed(lock)
+                logger.info(f"Seed applied ({inserted} new exercises, {templates} new base workouts)")
+        if inserted or templates:
+            bump_version("catalog")
+        logger.info(f"Database ready ({time.perf_counter() - start:.2f}s)")
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    prepare()
@@ -0,0 +1,194 @@
+import bisect
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+
+# Métriques par requête au format texte Prometheus, exposées sur /metrics :
+# latence par route (template, pas le chemin réel), statuts, requêtes en cours, et nombre
+# et durée des requêtes SQL de chaque requête HTTP (événements du moteur SQLAlchemy).
+# Comme /api/system/pool, les compteurs sont propres au process : sous gunicorn chaque
+# scrape lit un worker, le label `pid` garde ses séries distinctes (sum by sans pid).
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100)  # un N+1 sort des petits buckets
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+UNMATCHED_ROUTE = "unmatched"  # 404 : pas de chemin brut en label (cardinalité)
+
+
+class _RequestSql:
+    """Requêtes SQL de la requête HTTP en cours (partagé avec le threadpool via le contexte)."""
+
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+
+_current_sql: ContextVar[Optional[_RequestSql]] = ContextVar("current_sql", default=None)
+
+
+class _RouteStats:
+    __slots__ = ("latency", "latency_sum", "count", "sql_statements", "sql_statements_sum", "sql_seconds")
+
+    def __init__(self):
+        self.latency = [0] * (len(LATENCY_BUCKETS) + 1)  # dernier = +Inf ; non cumulés
+        self.latency_sum = 0.0
+        self.count = 0
+        self.sql_statements = [0] * (len(SQL_STATEMENT_BUCKETS) + 1)
+        self.sql_statements_sum = 0
+        self.sql_seconds = 0.0
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str], _RouteStats] = {}
+        self._statuses: Dict[Tuple[str, str, int], int] = {}
+        self.in_flight = 0
+
+    def observe(self, method: str, route: str, status: int, seconds: float, sql: _RequestSql) -> None:
+        with self._lock:
+            stats = self._routes.get((method, route))
+            if stats is None:
+                stats = self._routes[(method, route)] = _RouteStats()
+            stats.latency[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            stats.latency_sum += seconds
+            stats.count += 1
+            stats.sql_statements[bisect.bisect_left(SQL_STATEMENT_BUCKETS, sql.statements)] += 1
+            stats.sql_statements_sum += sql.statements
+            stats.sql_seconds += sql.seconds
+            key = (method, route, status)
+            self._statuses[key] = self._statuses.get(key, 0) + 1
+
+    def render(self) -> str:
+        pid = os.getpid()  # lu au rendu : le registre est créé avant le fork des workers
+        with self._lock:
+            routes = sorted(self._routes.items())
+            statuses = sorted(self._statuses.items())
+            in_flight = self.in_flight
+        lines: List[str] = [
+            "# HELP http_requests_in_flight Requests currently being served.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight{_labels(pid=pid)} {in_flight}",
+            "# HELP http_requests_total Requests served, by route template and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in statuses:
+            lines.append(f"http_requests_total{_labels(pid=pid, method=method, route=route, status=status)} {count}")
+        lines += [
+            "# HELP http_request_duration_seconds Request latency, by route template.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), stats in routes:
+            lines += _histogram(
+                "http_request_duration_seconds", _labels(pid=pid, method=method, route=route)[1:-1],
+                LATENCY_BUCKETS, stats.latency, stats.latency_sum, stats.count,
+            )
+        lines += [
+            "# HELP http_request_sql_statements SQL statements executed per request, by route template.",
+            "# TYPE http_request_sql_statements histogram",
+        ]
+        for (method, route), stats in routes:
+            lines += _histogram(
+                "http_request_sql_statements", _labels(pid=pid, method=method, route=route)[1:-1],
+                SQL_STATEMENT_BUCKETS, stats.sql_statements, stats.sql_statements_sum, stats.count,
+            )
+        lines += [
+            "# HELP http_request_sql_seconds_total Time spent in SQL statements, by route template.",
+            "# TYPE http_request_sql_seconds_total counter",
+        ]
+        for (method, route), stats in routes:
+            lines.append(f"http_request_sql_seconds_total{_labels(pid=pid, method=method, route=route)} {stats.sql_seconds!r}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _histogram(name: str, labels: str, bounds, counts: List[int], total, count: int) -> List[str]:
+    lines, cumulative = [], 0
+    for bound, bucket in zip(bounds, counts):
+        cumulative += bucket
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+    lines.append(f"{name}_sum{{{labels}}} {total!r}")
+    lines.append(f"{name}_count{{{labels}}} {count}")
+    return lines
+
+
+metrics = RequestMetrics()
+
+
+class MetricsMiddleware:
+    """Middleware ASGI pur : pas de BaseHTTPMiddleware ni de tâche en plus par requête."""
+
+    def __init__(self, app, registry: RequestMetrics = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500  # exception avant toute réponse
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        sql = _RequestSql()
+        token = _current_sql.set(sql)
+        self.registry.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.registry.in_flight -= 1
+            _current_sql.reset(token)
+            # scope["route"] : posé par FastAPI sur le scope partagé quand une route correspond
+            route = scope.get("route")
+            self.registry.observe(
+                scope["method"], getattr(route, "path", UNMATCHED_ROUTE), status, elapsed, sql
+            )
+
+
+# Début de la requête SQL posé sur son contexte d'exécution : rien à nettoyer quand elle
+# échoue (after_cursor_execute ne part pas, handle_error la compte à la place)
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current_sql.get() is not None:
+        context._metrics_start = time.perf_counter()
+
+
+def _observe_statement(context) -> None:
+    sql = _current_sql.get()
+    start = getattr(context, "_metrics_start", None)
+    if sql is not None and start is not None:
+        sql.statements += 1
+        sql.seconds += time.perf_counter() - start
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _observe_statement(context)
+
+
+def _handle_error(exception_context):
+    _observe_statement(exception_context.execution_context)
+
+
+def track_sql(engine) -> None:
+    """Compte les requêtes SQL du moteur (sync, ou sync_engine d'un moteur async) par requête HTTP."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
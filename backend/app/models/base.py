@@ -1,6 +1,7 @@
 from enum import Enum  
 from sqlmodel import SQLModel, Field, Relationship
-from datetime import datetime
+from sqlalchemy import Index, UniqueConstraint
+from datetime import datetime, date as date_type
 from typing import Optional, List 
 
 #USERS
@@ -34,6 +35,9 @@ class User(SQLModel, table=True):
     body_fat: Optional[float] = None
     activity_level: Optional[str] = None
     goal: Optional[str] = None
+    timezone: str = Field(default="UTC", sa_column_kwargs={"nullable": False, "server_default": "UTC"})  # IANA, ex: Europe/Paris
+    # Voit les templates partagés (workouts.template_key). Les comptes créés avant ont leurs propres copies
+    uses_templates: bool = Field(default=True, sa_column_kwargs={"nullable": False, "server_default": "false"})
     created_at: datetime = Field(sa_column_kwargs={"server_default": "now()"})
     updated_at: datetime = Field(sa_column_kwargs={"server_default": "now()", "onupdate": "now()"})
 
@@ -124,18 +128,24 @@ class Exercise(SQLModel, table=True):
 
 class Workout(SQLModel, table=True):
     __tablename__ = "workouts"
+    __table_args__ = (Index("ix_workouts_user_id_day_of_week", "user_id", "day_of_week"),)
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="users.id") 
+    user_id: Optional[int] = Field(default=None, foreign_key="users.id")  # NULL pour un template partagé
     name: str = Field(sa_column_kwargs={"nullable": False})
     date: datetime = Field(sa_column_kwargs={"server_default": "now()"})
     notes: Optional[str] = None
     day_of_week: Optional[int] = Field(default=None)
+    template_key: Optional[str] = Field(default=None, sa_column_kwargs={"unique": True})  # template intégré
+    template_id: Optional[int] = Field(default=None, foreign_key="workouts.id", ondelete="SET NULL")  # copie d'un template
 
     # Relations
-    user: "User" = Relationship(back_populates="workouts")
+    user: Optional["User"] = Relationship(back_populates="workouts")
     workout_exercises: List["WorkoutExercise"] = Relationship(
         back_populates="workout",
-        sa_relationship_kwargs={"cascade": "all, delete-orphan"}
+        sa_relationship_kwargs={
+            "cascade": "all, delete-orphan",
+            "order_by": "[WorkoutExercise.position, WorkoutExercise.id]",
+        }
     )
     logs: List["UserExerciseLog"] = Relationship(
         back_populates="workout",
@@ -144,6 +154,7 @@ class Workout(SQLModel, table=True):
 
 class WorkoutExercise(SQLModel, table=True):
     __tablename__ = "workout_exercises"
+    __table_args__ = (Index("ix_workout_exercises_workout_id", "workout_id"),)
     id: Optional[int] = Field(default=None, primary_key=True)
     workout_id: int = Field(foreign_key="workouts.id", ondelete="CASCADE")
     exercise_id: int = Field(foreign_key="exercises.id")
@@ -152,6 +163,7 @@ class WorkoutExercise(SQLModel, table=True):
     planned_weight: Optional[float] = None  
     rest_seconds: Optional[int] = None
     notes: Optional[str] = None
+    position: int = Field(default=0, sa_column_kwargs={"nullable": False, "server_default": "0"})  # ordre dans le plan
 
     # Relations
     workout: "Workout" = Relationship(back_populates="workout_exercises")
@@ -159,11 +171,22 @@ class WorkoutExercise(SQLModel, table=True):
 
 class UserExerciseLog(SQLModel, table=True):
     __tablename__ = "user_exercise_logs"
+    __table_args__ = (
+        Index("ix_user_exercise_logs_user_id_date", "user_id", "date", "id"),
+        Index(
+            "ix_user_exercise_logs_user_id_exercise_id_date",
+            "user_id", "exercise_id", "date",
+            postgresql_include=["reps", "weight"],
+        ),
+        Index("ix_user_exercise_logs_workout_id", "workout_id"),
+        Index("ix_user_exercise_logs_user_id_training_date", "user_id", "training_date"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", ondelete="CASCADE")
     exercise_id: int = Field(foreign_key="exercises.id")
     workout_id: Optional[int] = Field(foreign_key="workouts.id", ondelete="CASCADE")
     date: datetime = Field(sa_column_kwargs={"nullable": False, "server_default": "now()"})
+    training_date: date_type = Field(sa_column_kwargs={"nullable": False})  # Jour local du pratiquant (users.timezone)
     set_number: int = Field(sa_column_kwargs={"nullable": False})
     reps: int = Field(sa_column_kwargs={"nullable": False})
     weight: Optional[float] = None  # numeric(6,2)
@@ -176,4 +199,40 @@ class UserExerciseLog(SQLModel, table=True):
     # Relations
     user: "User" = Relationship(back_populates="logs")
     exercise: "Exercise" = Relationship(back_populates="logs")
-    workout: Optional["Workout"] = Relationship(back_populates="logs")
\ No newline at end of file
+    workout: Optional["Workout"] = Relationship(back_populates="logs")
+
+class PersonalRecord(SQLModel, table=True):
+    # Meilleure charge par (user, exercice, palier de reps), maintenue à l'écriture des logs
+    __tablename__ = "personal_records"
+    __table_args__ = (UniqueConstraint("user_id", "exercise_id", "reps"),)
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id", ondelete="CASCADE")
+    exercise_id: int = Field(foreign_key="exercises.id", ondelete="CASCADE")
+    reps: int = Field(sa_column_kwargs={"nullable": False})  # palier : 1, 5 ou 10 reps
+    weight: float = Field(sa_column_kwargs={"nullable": False})
+    log_id: Optional[int] = Field(default=None, foreign_key="user_exercise_logs.id", ondelete="SET NULL")
+    achieved_at: datetime = Field(sa_column_kwargs={"nullable": False})
+    updated_at: datetime = Field(sa_column_kwargs={"server_default": "now()", "onupdate": "now()"})
+
+class LogImportChunk(SQLModel, table=True):
+    # Morceaux d'import déjà chargés : un import interrompu reprend au premier morceau absent
+    __tablename__ = "log_import_chunks"
+    import_id: str = Field(primary_key=True, max_length=64)
+    chunk: int = Field(primary_key=True)
+    user_id: int = Field(foreign_key="users.id", ondelete="CASCADE")
+    inserted: int = Field(default=0, sa_column_kwargs={"nullable": False})
+    errors: int = Field(default=0, sa_column_kwargs={"nullable": False})
+    created_at: datetime = Field(sa_column_kwargs={"server_default": "now()"})
+
+class HiddenWorkoutTemplate(SQLModel, table=True):
+    # Template qu'un user ne voit plus : supprimé, ou remplacé par sa copie modifiée
+    __tablename__ = "hidden_workout_templates"
+    user_id: int = Field(foreign_key="users.id", primary_key=True, ondelete="CASCADE")
+    template_id: int = Field(foreign_key="workouts.id", primary_key=True, ondelete="CASCADE")
+
+class AppState(SQLModel, table=True):
+    # État du déploiement relu au démarrage (ex. checksum du seed du catalogue déjà appliqué)
+    __tablename__ = "app_state"
+    key: str = Field(primary_key=True, max_length=64)
+    value: str
+    updated_at: datetime = Field(sa_column_kwargs={"server_default": "now()"})
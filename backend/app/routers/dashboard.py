@@ -1,11 +1,43 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from app.database.db import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from datetime import datetime
+from app.database.config import settings
+from app.database.db import get_session, get_async_session
+from app.database.cache import CATALOG_SCOPE, cached_json, cached_json_async
 from app.crud import dashboard as crud_dashboard
 from app.schemas.dashboard import DashboardData
 
 router = APIRouter()
 
-@router.get("/{user_id}", response_model=DashboardData)
-def get_user_dashboard(user_id: int, session: Session = Depends(get_session)):
-    return crud_dashboard.get_dashboard_data(user_id=user_id, session=session)
\ No newline at end of file
+def _cache_params(summary: bool) -> dict:
+    # Le "jour" dépend du fuseau du user : la clé change tous les quarts d'heure UTC,
+    # ce qui suit n'importe quel minuit local (tous les décalages sont multiples de 15 min)
+    now = datetime.utcnow()
+    return {"summary": summary, "t": f"{now:%Y%m%d%H}{now.minute // 15}"}
+
+if settings.DB_ASYNC:
+
+    @router.get("/{user_id}", response_model=DashboardData)
+    async def get_user_dashboard(user_id: int, summary: bool = False, session: AsyncSession = Depends(get_async_session)):
+        return await cached_json_async(
+            "dashboard",
+            "user",
+            user_id,
+            _cache_params(summary),
+            lambda: crud_dashboard.get_dashboard_data_async(user_id=user_id, session=session, summary=summary),
+            depends_on=[CATALOG_SCOPE],
+        )
+
+else:
+
+    @router.get("/{user_id}", response_model=DashboardData)
+    def get_user_dashboard(user_id: int, summary: bool = False, session: Session = Depends(get_session)):
+        return cached_json(
+            "dashboard",
+            "user",
+            user_id,
+            _cache_params(summary),
+            lambda: crud_dashboard.get_dashboard_data(user_id=user_id, session=session, summary=summary),
+            depends_on=[CATALOG_SCOPE],
+        )
\ No newline at end of file
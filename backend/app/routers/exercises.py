@@ -1,12 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from typing import List, Optional
 from sqlalchemy.orm import Session
 from app.database.db import get_session
-from app.crud.exercises import create_exercise, get_exercise, get_exercises, update_exercise, delete_exercise, get_exercise_by_name, get_exercises_by_muscle_group, get_cardio_exercises
-from app.schemas.exercises import ExerciseCreate, ExerciseUpdate, ExerciseOut, ExerciseList
+from app.crud.exercises import CatalogSnapshot, create_exercise, get_catalog, get_exercises, update_exercise, delete_exercise, get_exercise_by_name
+from app.crud.pagination import next_cursor
+from app.routers.responses import json_response
+from app.schemas.exercises import ExerciseCreate, ExerciseUpdate, ExerciseOut, ExerciseList, ExerciseFacetResult
 
 router = APIRouter()
 
+def _not_modified(request: Request, response: Response, catalog: CatalogSnapshot) -> bool:
+    # ETag commun à toutes les lectures du catalogue : il change dès qu'un exercice change
+    etag = f'"{catalog.etag}"'
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return request.headers.get("if-none-match") == etag
+
 @router.post("/", response_model=ExerciseOut, status_code=status.HTTP_201_CREATED)
 def create_new_exercise(exercise_in: ExerciseCreate, session: Session = Depends(get_session)):
     try:
@@ -14,17 +23,64 @@ def create_new_exercise(exercise_in: ExerciseCreate, session: Session = Depends(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/cardio", response_model=List[ExerciseOut])
+def get_cardio(request: Request, response: Response, session: Session = Depends(get_session)):
+    catalog = get_catalog(session)
+    if _not_modified(request, response, catalog):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=dict(response.headers))
+    return json_response(list(catalog.cardio), List[ExerciseOut], response.headers)
+
+@router.get("/filter", response_model=ExerciseFacetResult)
+def filter_exercises(
+    request: Request,
+    response: Response,
+    muscle_group: List[str] = Query([]),
+    equipement: List[str] = Query([]),
+    difficulty: List[str] = Query([]),
+    is_cardio: Optional[bool] = None,
+    offset: int = 0,
+    limit: int = 100,
+    session: Session = Depends(get_session),
+):
+    # Plusieurs valeurs d'une même facette = OU, facettes différentes = ET
+    catalog = get_catalog(session)
+    if _not_modified(request, response, catalog):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=dict(response.headers))
+    exercises, facets = catalog.facet_index.filter({
+        "muscle_group": muscle_group,
+        "equipement": equipement,
+        "difficulty": difficulty,
+        "is_cardio": [] if is_cardio is None else [str(is_cardio).lower()],
+    })
+    page = ExerciseFacetResult.model_construct(exercises=exercises[offset:offset + limit], total=len(exercises), facets=facets)
+    return json_response(page, ExerciseFacetResult, response.headers)
+
 @router.get("/{exercise_id}", response_model=ExerciseOut)
-def read_exercise(exercise_id: int, session: Session = Depends(get_session)):
-    exercise = get_exercise(exercise_id, session)
+def read_exercise(exercise_id: int, request: Request, response: Response, session: Session = Depends(get_session)):
+    catalog = get_catalog(session)
+    # 404 avant le test conditionnel : un id inconnu ne doit jamais répondre 304
+    exercise = catalog.by_id.get(exercise_id)
     if not exercise:
         raise HTTPException(status_code=404, detail="Exercise not found")
+    if _not_modified(request, response, catalog):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=dict(response.headers))
     return exercise
 
 @router.get("/", response_model=ExerciseList)
-def read_exercises(offset: int = 0, limit: int = 100, session: Session = Depends(get_session)):
-    exercises = get_exercises(session, offset, limit)
-    return {"exercises": exercises, "total": len(exercises)}
+def read_exercises(request: Request, response: Response, offset: int = 0, limit: int = 100, cursor: Optional[str] = None, session: Session = Depends(get_session)):
+    catalog = get_catalog(session)
+    if _not_modified(request, response, catalog):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=dict(response.headers))
+    try:
+        exercises = get_exercises(session, offset, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page = ExerciseList.model_construct(
+        exercises=exercises,
+        total=len(catalog.exercises),
+        next_cursor=next_cursor(exercises, limit, lambda e: (e.id,)),
+    )
+    return json_response(page, ExerciseList, response.headers)
 
 @router.put("/{exercise_id}", response_model=ExerciseOut)
 def update_existing_exercise(exercise_id: int, exercise_update: ExerciseUpdate, session: Session = Depends(get_session)):
@@ -41,13 +97,12 @@ def delete_existing_exercise(exercise_id: int, session: Session = Depends(get_se
     return None
 
 @router.get("/search/{name}", response_model=List[ExerciseOut])
-def search_exercise_by_name(name: str, session: Session = Depends(get_session)):
-    return get_exercise_by_name(name, session)
+def search_exercise_by_name(name: str, limit: int = Query(20, ge=1, le=100), session: Session = Depends(get_session)):
+    return json_response(get_exercise_by_name(name, session, limit), List[ExerciseOut])
 
 @router.get("/muscle/{muscle_group}", response_model=List[ExerciseOut])
-def get_by_muscle_group(muscle_group: str, session: Session = Depends(get_session)):
-    return get_exercises_by_muscle_group(muscle_group, session)
-
-@router.get("/cardio", response_model=List[ExerciseOut])
-def get_cardio(session: Session = Depends(get_session)):
-    return get_cardio_exercises(session)
\ No newline at end of file
+def get_by_muscle_group(muscle_group: str, request: Request, response: Response, session: Session = Depends(get_session)):
+    catalog = get_catalog(session)
+    if _not_modified(request, response, catalog):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=dict(response.headers))
+    return json_response(list(catalog.by_muscle_group.get(muscle_group, ())), List[ExerciseOut], response.headers)
@@ -1,11 +1,61 @@
-from fastapi import APIRouter, Depends, status
+import codecs
+from itertools import islice
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, status
+from typing import List, Optional
 from sqlalchemy.orm import Session
-from app.database.db import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database.config import settings
+from app.database.db import get_session, get_async_session
+from app.models.base import User
 from app.crud import user_exercise_log as crud_logs
-from app.schemas.user_exercise_log import UserExerciseLogCreate, UserExerciseLogOut
+from app.crud import log_import as crud_import
+from app.routers.users import get_current_user, get_current_user_async
+from app.routers.responses import json_response
+from app.schemas.user_exercise_log import UserExerciseLogCreate, UserExerciseLogBase, AddLogsToWorkout
+from app.schemas.log_import import LogImportResult, LogImportStatus
 
 router = APIRouter()
 
-@router.post("/", response_model=UserExerciseLogOut, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=UserExerciseLogBase, status_code=status.HTTP_201_CREATED)
 def create_new_log(log_in: UserExerciseLogCreate, user_id: int, session: Session = Depends(get_session)):
-    return crud_logs.create_log(log_in=log_in, user_id=user_id, session=session)
\ No newline at end of file
+    return crud_logs.create_log(log_in=log_in, user_id=user_id, session=session)
+
+@router.post("/import", response_model=LogImportResult)
+def import_logs(file: UploadFile, import_id: str = Query(..., min_length=1, max_length=64), chunk: int = Query(0, ge=0), format: Optional[str] = None, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+    # Un appel = un morceau ; le client découpe son fichier et rejoue les morceaux en échec
+    fmt = format or (file.filename or "").rsplit(".", 1)[-1].lower()
+    lines = codecs.iterdecode(file.file, "utf-8-sig")
+    try:
+        records = list(islice(crud_import.read_records(lines, fmt), crud_import.IMPORT_MAX_ROWS + 1))
+        return crud_import.import_log_chunk(session, current_user.id, import_id, chunk, records)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/import/{import_id}", response_model=LogImportStatus)
+def read_import_status(import_id: str, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+    status_ = crud_import.get_import_status(session, current_user.id, import_id)
+    if not status_:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return status_
+
+if settings.DB_ASYNC:
+
+    @router.post("/batch", response_model=List[UserExerciseLogBase], status_code=status.HTTP_201_CREATED)
+    async def create_logs_batch(data: AddLogsToWorkout, session: AsyncSession = Depends(get_async_session), current_user: User = Depends(get_current_user_async)):
+        try:
+            logs = await crud_logs.bulk_create_logs_async(session, current_user.id, data.logs)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return json_response(logs, List[UserExerciseLogBase], status_code=status.HTTP_201_CREATED)
+
+else:
+
+    @router.post("/batch", response_model=List[UserExerciseLogBase], status_code=status.HTTP_201_CREATED)
+    def create_logs_batch(data: AddLogsToWorkout, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+        try:
+            logs = crud_logs.bulk_create_logs(session, current_user.id, data.logs)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return json_response(logs, List[UserExerciseLogBase], status_code=status.HTTP_201_CREATED)
@@ -0,0 +1,36 @@
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+from fastapi import status
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+# Chemin rapide des listes : le CRUD renvoie des modèles déjà validés. Retourner une
+# Response évite à FastAPI de les revalider contre response_model puis de les passer
+# par jsonable_encoder + json.dumps ; pydantic-core les sérialise une seule fois.
+# response_model reste déclaré sur la route pour la doc OpenAPI.
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def dump_json(data: Any, schema: Any) -> bytes:
+    """`data` doit déjà avoir le type `schema` (modèles, pas de dicts) : aucune validation ici."""
+    return _adapter(schema).dump_json(data)
+
+
+def json_response(
+    data: Any,
+    schema: Any,
+    headers: Optional[Mapping[str, str]] = None,
+    status_code: int = status.HTTP_200_OK,
+) -> Response:
+    # Les headers posés sur le paramètre `response` de la route ne sont pas repris
+    # quand la route renvoie sa propre Response : les passer via `headers`
+    return Response(
+        content=dump_json(data, schema),
+        status_code=status_code,
+        media_type="application/json",
+        headers=dict(headers) if headers else None,
+    )
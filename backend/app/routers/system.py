@@ -0,0 +1,50 @@
+import logging
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import SQLAlchemyError
+from app.database.config import settings
+from app.database.db import engine, async_engine
+from app.database.pool import pool_stats
+from app.database.startup import head_revision, read_state, schema_ready, seed_checksum
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/pool")
+def read_pool_stats():
+    """
+    État et compteurs du pool de connexions de ce process (chaque worker a le sien) :
+    attente au checkout, saturation (connexions prises / capacité) et churn
+    (ouvertures, fermetures, invalidations).
+    """
+    return {
+        "pgbouncer": settings.DB_PGBOUNCER,
+        "pre_ping": settings.DB_POOL_PRE_PING,
+        "recycle_seconds": settings.DB_POOL_RECYCLE,
+        "sync": pool_stats(engine),
+        "async": pool_stats(async_engine.sync_engine) if async_engine is not None else None,
+    }
+
+@router.get("/ready")
+def read_readiness():
+    """
+    Sonde de readiness : 200 si la base répond et que son schéma n'est pas en retard sur
+    le code (révision alembic), 503 sinon. Le seed du catalogue est indiqué sans bloquer.
+    """
+    try:
+        with engine.connect() as conn:
+            revision, checksum = read_state(conn)
+    except SQLAlchemyError as e:
+        logger.warning(f"Readiness check failed: {e}")
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"ready": False, "detail": "Database unavailable"})
+    ready = schema_ready(revision)
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "ready": ready,
+            "revision": revision,
+            "head": head_revision(),
+            "catalog_seeded": checksum == seed_checksum(),
+        },
+    )
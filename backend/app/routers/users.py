@@ -1,23 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from typing import List, Optional
+from typing import List, Optional, Union
 from jose import JWTError, jwt
-from datetime import timedelta, datetime, timezone  # Import timezone
+from datetime import date, timedelta, datetime, timezone  # Import timezone
 from sqlalchemy.orm import Session
 from sqlalchemy import select, func  # Import func for COUNT
-from ..database.db import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..database.config import settings
+from ..database.db import get_session, get_async_session
 from ..models.base import User
-from ..crud.workouts import create_default_workouts
+from ..crud.principals import get_principal, get_principal_async
+from ..crud.pagination import next_cursor
+from ..crud.log_export import EXPORT_FORMATS, export_user_logs
+from .responses import json_response
 from ..crud.user import (
     create_user,
     get_user,
     get_users,
     update_user,
     delete_user,
-    pwd_context,
     update_user_password,
+    user_today,
+    authenticate_user,
+    authenticate_user_async,
+    verify_password,
+)
+from ..crud.user_exercise_log import (
+    get_user_exercise_logs,
+    get_user_exercise_logs_async,
+    get_user_exercise_logs_expanded,
+    log_cursor,
+    get_training_days,
+    get_weekly_streak,
+    parse_log_expand,
 )
-from ..crud.user_exercise_log import get_user_exercise_logs
 from ..schemas.user import (
     UserCreate,
     UserList,
@@ -26,7 +43,16 @@ from ..schemas.user import (
     TokenData,
     PasswordChange,
 )
-from ..schemas.user_exercise_log import UserExerciseLogOut
+from ..crud.stats import get_user_stats
+from ..crud.personal_records import get_personal_records
+from ..schemas.user_exercise_log import (
+    UserExerciseLogFlat,
+    UserExerciseLogExpanded,
+    TrainingCalendar,
+    TrainingStreak,
+)
+from ..schemas.stats import StatsPeriod, UserStats
+from ..schemas.personal_records import PersonalRecordOut
 import os
 
 router = APIRouter()
@@ -47,14 +73,16 @@ def create_access_token(data: dict):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_user(
-    session: Session = Depends(get_session), token: str = Depends(oauth2_scheme)
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _decode_token(token: str) -> int:
+    credentials_exception = _credentials_exception()
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         sub: Optional[str] = payload.get("sub")
@@ -67,10 +95,24 @@ def get_current_user(
         token_data = TokenData(user_id=user_id)
     except JWTError:
         raise credentials_exception
+    return token_data.user_id
+
 
-    user = session.get(User, token_data.user_id)
+def get_current_user(
+    session: Session = Depends(get_session), token: str = Depends(oauth2_scheme)
+) -> User:
+    user = get_principal(session, _decode_token(token))
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    return user
+
+
+async def get_current_user_async(
+    session: AsyncSession = Depends(get_async_session), token: str = Depends(oauth2_scheme)
+) -> User:
+    user = await get_principal_async(session, _decode_token(token))
+    if user is None:
+        raise _credentials_exception()
     return user
 
 
@@ -91,27 +133,13 @@ def create_new_user(user_in: UserCreate, session: Session = Depends(get_session)
     if existing_username:
         raise HTTPException(status_code=409, detail="Username already registered")
 
+    # Les workouts de base sont des templates partagés (crud/workout_templates.py) : rien à copier
     user = create_user(user_in, session)
-    try:
-        
-        create_default_workouts(db=session, user_id=user.id)
-
-    except Exception as e:
-        print(f"ATTENTION: L'utilisateur {user.email} a été créé, mais la création des workouts de base a échoué: {e}")
-    
     return user
 
 
-@router.post("/login", summary="User login")
-def login(
-    form_data: OAuth2PasswordRequestForm = Depends(),
-    session: Session = Depends(get_session),
-):
-    """
-    Connecte l'utilisateur et retourne un token JWT.
-    """
-    user = session.exec(select(User).where(User.email == form_data.username)).scalar()
-    if not user or not pwd_context.verify(form_data.password, user.hashed_password):
+def _login_response(user: Optional[User]) -> dict:
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -126,6 +154,33 @@ def login(
     }
 
 
+if settings.DB_ASYNC:
+
+    @router.post("/login", summary="User login")
+    async def login(
+        form_data: OAuth2PasswordRequestForm = Depends(),
+        session: AsyncSession = Depends(get_async_session),
+    ):
+        """
+        Connecte l'utilisateur et retourne un token JWT.
+        """
+        user = await authenticate_user_async(form_data.username, form_data.password, session)
+        return _login_response(user)
+
+else:
+
+    @router.post("/login", summary="User login")
+    def login(
+        form_data: OAuth2PasswordRequestForm = Depends(),
+        session: Session = Depends(get_session),
+    ):
+        """
+        Connecte l'utilisateur et retourne un token JWT.
+        """
+        user = authenticate_user(form_data.username, form_data.password, session)
+        return _login_response(user)
+
+
 # --- Routes Protégées (Nécessitent une authentification) ---
 
 
@@ -142,15 +197,26 @@ def read_users(
     session: Session = Depends(get_session),
     offset: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    with_total: bool = True,
     # 🔒 Seuls les utilisateurs authentifiés peuvent voir la liste
     current_user: User = Depends(get_current_user),
 ):
     """
-    Récupère une liste paginée d'utilisateurs.
+    Récupère une liste paginée d'utilisateurs (par offset ou par `cursor` = `next_cursor`
+    de la page précédente ; `with_total=false` évite le count).
     """
-    users = get_users(session, offset, limit)
-    total_users = session.exec(select(func.count(User.id))).one()
-    return {"users": users, "total": total_users}
+    try:
+        users = get_users(session, offset, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    total_users = session.exec(select(func.count(User.id))).scalar_one() if with_total else None
+    page = UserList.model_construct(
+        users=[UserOut.model_validate(u) for u in users],
+        total=total_users,
+        next_cursor=next_cursor(users, limit, lambda u: (u.id,)),
+    )
+    return json_response(page, UserList)
 
 
 @router.get("/{user_id}", response_model=UserOut, summary="Get user by ID")
@@ -203,9 +269,14 @@ def change_password(
     Change le mot de passe de l'utilisateur actuellement connecté.
     Nécessite le mot de passe actuel et le nouveau mot de passe.
     """
+    # Le principal en cache n'a pas de hash : on recharge le user depuis la base
+    user = get_user(current_user.id, session)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
     # Vérifier que le mot de passe actuel est correct
-    if not pwd_context.verify(
-        password_data.current_password, current_user.hashed_password
+    if not verify_password(
+        password_data.current_password, user.hashed_password
     ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -220,7 +291,7 @@ def change_password(
         )
 
     # Mettre à jour le mot de passe
-    update_user_password(current_user, password_data.new_password, session)
+    update_user_password(user, password_data.new_password, session)
 
     return {"message": "Password updated successfully"}
 
@@ -240,25 +311,217 @@ def delete_current_user(
     return None
 
 
+def _check_log_access(current_user: User, user_id: int, expand: Optional[str]):
+    if current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access these logs",
+        )
+
+    try:
+        return parse_log_expand(expand)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _flat_page(logs: List[UserExerciseLogFlat], limit: int) -> Response:
+    # La liste plate reste un tableau JSON : le curseur suivant passe par un header
+    cursor = log_cursor(logs, limit)
+    return json_response(logs, List[UserExerciseLogFlat], {"X-Next-Cursor": cursor} if cursor else None)
+
+
+if settings.DB_ASYNC:
+
+    @router.get(
+        "/{user_id}/logs",
+        response_model=Union[List[UserExerciseLogFlat], UserExerciseLogExpanded],
+        summary="Get exercise logs for a user",
+    )
+    async def read_user_logs(
+        user_id: int,
+        offset: int = 0,
+        limit: int = 100,
+        exercise_id: Optional[int] = None,
+        expand: Optional[str] = None,
+        cursor: Optional[str] = None,
+        session: AsyncSession = Depends(get_async_session),
+        current_user: User = Depends(get_current_user_async),
+    ):
+        """
+        Sans `expand` : liste plate des logs (nom d'exercice et de workout joints).
+        Avec `expand=exercise,workout` : logs + exercices/workouts référencés, chargés une seule fois.
+        `cursor` : pagination par curseur (`next_cursor` ou header `X-Next-Cursor`).
+        """
+        expansions = _check_log_access(current_user, user_id, expand)
+        try:
+            if expansions:
+                page = await session.run_sync(
+                    get_user_exercise_logs_expanded, user_id, expansions, offset, limit, exercise_id, None, cursor
+                )
+                return json_response(page, UserExerciseLogExpanded)
+            logs = await get_user_exercise_logs_async(session, user_id, offset, limit, exercise_id, cursor=cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return _flat_page(logs, limit)
+
+else:
+
+    @router.get(
+        "/{user_id}/logs",
+        response_model=Union[List[UserExerciseLogFlat], UserExerciseLogExpanded],
+        summary="Get exercise logs for a user",
+    )
+    def read_user_logs(
+        user_id: int,
+        offset: int = 0,
+        limit: int = 100,
+        exercise_id: Optional[int] = None,
+        expand: Optional[str] = None,
+        cursor: Optional[str] = None,
+        session: Session = Depends(get_session),
+        current_user: User = Depends(get_current_user),
+    ):
+        """
+        Sans `expand` : liste plate des logs (nom d'exercice et de workout joints).
+        Avec `expand=exercise,workout` : logs + exercices/workouts référencés, chargés une seule fois.
+        `cursor` : pagination par curseur (`next_cursor` ou header `X-Next-Cursor`).
+        """
+        expansions = _check_log_access(current_user, user_id, expand)
+        try:
+            if expansions:
+                page = get_user_exercise_logs_expanded(
+                    session, user_id, expansions, offset, limit, exercise_id, cursor=cursor
+                )
+                return json_response(page, UserExerciseLogExpanded)
+            logs = get_user_exercise_logs(session, user_id, offset, limit, exercise_id, cursor=cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return _flat_page(logs, limit)
+
+
 @router.get(
-    "/{user_id}/logs",
-    response_model=List[UserExerciseLogOut],
-    summary="Get exercise logs for a user",
+    "/{user_id}/logs/export",
+    response_class=StreamingResponse,
+    summary="Stream a user's full log history as NDJSON or CSV",
 )
-def read_user_logs(
+def export_user_logs_endpoint(
     user_id: int,
-    offset: int = 0,
-    limit: int = 100,
+    format: str = "ndjson",
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Exporte tout l'historique (du plus ancien au plus récent) en flux, sans pagination.
+    """
+    if current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access these logs",
+        )
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown format '{format}', expected one of: {', '.join(EXPORT_FORMATS)}",
+        )
+
+    return StreamingResponse(
+        export_user_logs(user_id, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="jymbro-logs-{user_id}.{format}"'},
+    )
+
+
+@router.get(
+    "/{user_id}/stats",
+    response_model=UserStats,
+    summary="Get aggregated training statistics for a user",
+)
+def read_user_stats(
+    user_id: int,
+    period: StatsPeriod = StatsPeriod.WEEK,
     exercise_id: Optional[int] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
-    
+    """
+    Volume, top set et nombre de séries par exercice, regroupés par jour, semaine ou mois.
+    """
     if current_user.id != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access these logs",
+            detail="Not authorized to access these stats",
+        )
+
+    return get_user_stats(session, user_id, period, exercise_id, start, end)
+
+
+@router.get(
+    "/{user_id}/records",
+    response_model=List[PersonalRecordOut],
+    summary="Get personal records for a user",
+)
+def read_user_records(
+    user_id: int,
+    exercise_id: Optional[int] = None,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Records personnels (meilleure charge à 1, 5 et 10 reps) par exercice.
+    """
+    if current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access these records",
+        )
+
+    return json_response(get_personal_records(session, user_id, exercise_id), List[PersonalRecordOut])
+
+
+@router.get(
+    "/{user_id}/calendar",
+    response_model=TrainingCalendar,
+    summary="Get the days a user trained in a date range",
+)
+def read_user_calendar(
+    user_id: int,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Jours d'entraînement (dans le fuseau du user) pour le calendrier d'historique.
+    Par défaut : les 5 dernières semaines.
+    """
+    if current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this calendar",
+        )
+
+    end = end or user_today(session, user_id)
+    start = start or end - timedelta(days=34)
+    days = get_training_days(session, user_id, start, end)
+    return {"start": start, "end": end, "days": days}
+
+
+@router.get(
+    "/{user_id}/streak",
+    response_model=TrainingStreak,
+    summary="Get the current weekly training streak",
+)
+def read_user_streak(
+    user_id: int,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    if current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this streak",
         )
 
-    logs = get_user_exercise_logs(session, user_id, offset, limit, exercise_id)
-    return logs
+    weeks = get_weekly_streak(session, user_id, user_today(session, user_id))
+    return {"weeks": weeks}
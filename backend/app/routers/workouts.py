@@ -1,15 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from typing import List, Optional, Union
 from sqlalchemy.orm import Session
-from datetime import datetime
-from app.database.db import get_session
-from app.models.base import Workout 
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database.config import settings
+from app.database.db import get_session, get_async_session
+from app.database.cache import CATALOG_SCOPE, cached_json, cached_json_async
+from app.models.base import User, Workout 
 from app.crud import workouts as crud_workouts
 from app.crud import workout_exercises as crud_workout_exercises
 from app.crud import user_exercise_log as crud_user_exercise_log
-from app.schemas.workouts import WorkoutCreate, WorkoutUpdate, WorkoutOut, WorkoutList
+from app.crud.pagination import next_cursor
+from app.crud.user import user_today, user_today_async
+from app.routers.responses import json_response
+from app.routers.users import get_current_user
+from app.schemas.workouts import WorkoutCreate, WorkoutUpdate, WorkoutOut, WorkoutDetail, WorkoutList
 from app.schemas.workout_exercises import WorkoutExerciseOut, AddExercisesToWorkout 
-from app.schemas.user_exercise_log import UserExerciseLogOut, AddLogsToWorkout
+from app.schemas.user_exercise_log import UserExerciseLogBase, UserExerciseLogFlat, UserExerciseLogExpanded, AddLogsToWorkout
 
 
 router = APIRouter()
@@ -21,64 +27,150 @@ def create_new_workout(workout_in: WorkoutCreate, session: Session = Depends(get
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/{workout_id}", response_model=WorkoutOut)
-def read_workout(workout_id: int, session: Session = Depends(get_session)):
-    workout = crud_workouts.get_workout(workout_id, session)
-    if not workout:
-        raise HTTPException(status_code=404, detail="Workout not found")
-    return workout
+def _workout_page(workouts: List[WorkoutDetail], total: Optional[int], limit: int) -> Response:
+    page = WorkoutList.model_construct(workouts=workouts, total=total, next_cursor=next_cursor(workouts, limit, lambda w: (w.id,)))
+    return json_response(page, WorkoutList)
+
+def _page_params(offset: int, limit: int, cursor: Optional[str], with_total: bool) -> dict:
+    return {"offset": offset, "limit": limit, "cursor": cursor or "", "total": with_total}
+
+if settings.DB_ASYNC:
+
+    @router.get("/{workout_id}", response_model=WorkoutDetail)
+    async def read_workout(workout_id: int, session: AsyncSession = Depends(get_async_session)):
+        async def load():
+            workout = await crud_workouts.get_workout_async(workout_id, session)
+            if not workout:
+                raise HTTPException(status_code=404, detail="Workout not found")
+            return workout
+        return await cached_json_async("workout", "workout", workout_id, {}, load, depends_on=[CATALOG_SCOPE])
+
+    @router.get("/", response_model=WorkoutList)
+    async def read_workouts(offset: int = 0, limit: int = 100, user_id: Optional[int] = None, cursor: Optional[str] = None, with_total: bool = True, session: AsyncSession = Depends(get_async_session)):
+        async def load():
+            try:
+                workouts, total = await crud_workouts.get_workouts_async(session, offset, limit, user_id, cursor, with_total)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            return _workout_page(workouts, total, limit)
+        if user_id is None:
+            return await load()
+        return await cached_json_async("workouts", "user", user_id, _page_params(offset, limit, cursor, with_total), load, depends_on=[CATALOG_SCOPE])
+
+else:
 
-@router.get("/", response_model=WorkoutList)
-def read_workouts(offset: int = 0, limit: int = 100, user_id: Optional[int] = None, session: Session = Depends(get_session)):
-    workouts, total = crud_workouts.get_workouts(session, offset, limit, user_id)
-    return {"workouts": workouts, "total": total} # J'ai aussi corrigé le bug de pagination ici
+    @router.get("/{workout_id}", response_model=WorkoutDetail)
+    def read_workout(workout_id: int, session: Session = Depends(get_session)):
+        def load():
+            workout = crud_workouts.get_workout(workout_id, session)
+            if not workout:
+                raise HTTPException(status_code=404, detail="Workout not found")
+            return workout
+        return cached_json("workout", "workout", workout_id, {}, load, depends_on=[CATALOG_SCOPE])
+
+    @router.get("/", response_model=WorkoutList)
+    def read_workouts(offset: int = 0, limit: int = 100, user_id: Optional[int] = None, cursor: Optional[str] = None, with_total: bool = True, session: Session = Depends(get_session)):
+        def load():
+            try:
+                workouts, total = crud_workouts.get_workouts(session, offset, limit, user_id, cursor, with_total)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            return _workout_page(workouts, total, limit) # J'ai aussi corrigé le bug de pagination ici
+        if user_id is None:
+            return load()
+        return cached_json("workouts", "user", user_id, _page_params(offset, limit, cursor, with_total), load, depends_on=[CATALOG_SCOPE])
 
 @router.put("/{workout_id}", response_model=WorkoutOut)
-def update_existing_workout(workout_id: int, workout_update: WorkoutUpdate, session: Session = Depends(get_session)):
-    updated = crud_workouts.update_workout(workout_id, workout_update, session)
+def update_existing_workout(workout_id: int, workout_update: WorkoutUpdate, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+    # Template partagé : la modification crée la copie du user authentifié
+    try:
+        updated = crud_workouts.update_workout(workout_id, workout_update, session, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not updated:
         raise HTTPException(status_code=404, detail="Workout not found")
     return updated
 
 @router.delete("/{workout_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_existing_workout(workout_id: int, session: Session = Depends(get_session)):
-    deleted = crud_workouts.delete_workout(workout_id, session)
+def delete_existing_workout(workout_id: int, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+    try:
+        deleted = crud_workouts.delete_workout(workout_id, session, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not deleted:
         raise HTTPException(status_code=404, detail="Workout not found")
     return None
 
 @router.post("/{workout_id}/exercises", response_model=List[WorkoutExerciseOut])
-def add_exercises_to_workout(workout_id: int, data: AddExercisesToWorkout, session: Session = Depends(get_session)):
+def add_exercises_to_workout(workout_id: int, data: AddExercisesToWorkout, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
     try:
-        return crud_workout_exercises.add_exercises_to_workout(workout_id, data, session)
+        added = crud_workout_exercises.add_exercises_to_workout(workout_id, data, session, current_user.id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    if added is None:
+        raise HTTPException(status_code=404, detail="Workout not found")
+    return json_response(added, List[WorkoutExerciseOut])
 
 @router.get("/{workout_id}/exercises", response_model=List[WorkoutExerciseOut])
 def get_workout_exercises(workout_id: int, session: Session = Depends(get_session)):
     exercises = crud_workout_exercises.get_workout_exercises(workout_id, session)
-    return exercises
+    return json_response(exercises, List[WorkoutExerciseOut])
 
-@router.post("/{workout_id}/logs", response_model=List[UserExerciseLogOut])
+@router.post("/{workout_id}/logs", response_model=List[UserExerciseLogBase])
 def add_logs_to_workout_endpoint(workout_id: int, user_id: int, data: AddLogsToWorkout, session: Session = Depends(get_session)):
     try:
-        return crud_user_exercise_log.add_logs_to_workout(user_id, workout_id, data, session)
+        logs = crud_user_exercise_log.add_logs_to_workout(session=session, user_id=user_id, workout_id=workout_id, logs_data=data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    return json_response(logs, List[UserExerciseLogBase])
 
-@router.get("/{workout_id}/logs", response_model=List[UserExerciseLogOut])
-def read_workout_logs(workout_id: int, session: Session = Depends(get_session)):
+@router.get("/{workout_id}/logs", response_model=Union[List[UserExerciseLogFlat], UserExerciseLogExpanded])
+def read_workout_logs(workout_id: int, offset: int = 0, limit: int = 100, expand: Optional[str] = None, cursor: Optional[str] = None, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
     workout = session.get(Workout, workout_id)
     if not workout:
         raise HTTPException(status_code=404, detail="Workout not found")
-    logs = crud_user_exercise_log.get_user_exercise_logs(
-        session=session,
-        user_id=workout.user_id,
-        workout_id=workout_id
-    )
-    return logs
-
-@router.get("/today/", response_model=Optional[WorkoutOut])
-def get_todays_workout_for_user(user_id: int, session: Session = Depends(get_session)):
-    day_of_week = datetime.today().isoweekday() # Lundi = 1, ..., Dimanche = 7
-    return crud_workouts.get_workout_for_day(user_id=user_id, day_of_week=day_of_week, session=session)
\ No newline at end of file
+    owner_id = workout.user_id or current_user.id  # template partagé : les logs du user authentifié
+    try:
+        expansions = crud_user_exercise_log.parse_log_expand(expand)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        if expansions:
+            page = crud_user_exercise_log.get_user_exercise_logs_expanded(
+                session=session,
+                user_id=owner_id,
+                expand=expansions,
+                offset=offset,
+                limit=limit,
+                workout_id=workout_id,
+                cursor=cursor
+            )
+            return json_response(page, UserExerciseLogExpanded)
+        logs = crud_user_exercise_log.get_user_exercise_logs(
+            session=session,
+            user_id=owner_id,
+            offset=offset,
+            limit=limit,
+            workout_id=workout_id,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    cursor = crud_user_exercise_log.log_cursor(logs, limit)
+    return json_response(logs, List[UserExerciseLogFlat], {"X-Next-Cursor": cursor} if cursor else None)
+
+if settings.DB_ASYNC:
+
+    @router.get("/today/", response_model=Optional[WorkoutDetail])
+    async def get_todays_workout_for_user(user_id: int, session: AsyncSession = Depends(get_async_session)):
+        # Jour local du user (comme le dashboard), pas celui du serveur ; Lundi = 1, ..., Dimanche = 7
+        day_of_week = (await user_today_async(session, user_id)).isoweekday()
+        return await crud_workouts.get_workout_for_day_async(user_id=user_id, day_of_week=day_of_week, session=session)
+
+else:
+
+    @router.get("/today/", response_model=Optional[WorkoutDetail])
+    def get_todays_workout_for_user(user_id: int, session: Session = Depends(get_session)):
+        # Jour local du user (comme le dashboard), pas celui du serveur ; Lundi = 1, ..., Dimanche = 7
+        day_of_week = user_today(session, user_id).isoweekday()
+        return crud_workouts.get_workout_for_day(user_id=user_id, day_of_week=day_of_week, session=session)
\ No newline at end of file
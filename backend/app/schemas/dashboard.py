@@ -1,7 +1,8 @@
 from pydantic import BaseModel
-from typing import Optional
-from .workouts import WorkoutOut
+from typing import Optional, Union
+from .workouts import WorkoutDetail, WorkoutSummary
 
 class DashboardData(BaseModel):
-    todays_workout: Optional[WorkoutOut] = None
+    # WorkoutSummary quand le dashboard est demandé en mode `summary`
+    todays_workout: Optional[Union[WorkoutDetail, WorkoutSummary]] = None
     yesterday_skipped: bool = False
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Optional
 from datetime import datetime
 from app.models.base import Exercise, MuscleGroup, Difficulty
 
@@ -36,4 +36,10 @@ class ExerciseOut(BaseModel):
 
 class ExerciseList(BaseModel):
     exercises: list[ExerciseOut]
-    total: int
\ No newline at end of file
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class ExerciseFacetResult(BaseModel):
+    exercises: list[ExerciseOut]
+    total: int
+    facets: Dict[str, Dict[str, int]]
\ No newline at end of file
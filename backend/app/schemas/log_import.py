@@ -0,0 +1,44 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List
+from datetime import datetime
+
+
+class LogImportRow(BaseModel):
+    # Une ligne du fichier importé (CSV ou NDJSON). Les colonnes inconnues sont ignorées,
+    # un export /logs/export peut donc être réimporté tel quel.
+    date: datetime  # naïve = UTC, comme en base
+    exercise: Optional[str] = None  # nom du catalogue
+    exercise_id: Optional[int] = None
+    set_number: int = Field(ge=1)
+    reps: int = Field(ge=0)
+    weight: Optional[float] = Field(default=None, ge=0)
+    rest_seconds: Optional[int] = Field(default=None, ge=0)
+    duration_seconds: Optional[int] = Field(default=None, ge=0)
+    distance_m: Optional[float] = Field(default=None, ge=0)
+    volume: Optional[float] = Field(default=None, ge=0)
+
+    @model_validator(mode="after")
+    def _check_exercise(self):
+        if self.exercise_id is None and not self.exercise:
+            raise ValueError("exercise or exercise_id is required")
+        return self
+
+
+class LogImportError(BaseModel):
+    line: int
+    error: str
+
+
+class LogImportResult(BaseModel):
+    import_id: str
+    chunk: int
+    inserted: int
+    skipped: bool = False  # morceau déjà importé
+    errors: List[LogImportError] = []
+
+
+class LogImportStatus(BaseModel):
+    import_id: str
+    chunks: List[int]
+    inserted: int
+    errors: int
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class PersonalRecordOut(BaseModel):
+    exercise_id: int
+    exercise_name: str
+    reps: int
+    weight: float
+    log_id: Optional[int] = None
+    achieved_at: datetime
+
+    class Config:
+        from_attributes = True
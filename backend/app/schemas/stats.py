@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import date
+from enum import Enum
+
+
+class StatsPeriod(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class ExerciseStatsBucket(BaseModel):
+    bucket: date  # premier jour local de la période (YYYY-MM-DD)
+    volume: float
+    top_weight: Optional[float] = None
+    total_reps: int
+    set_count: int
+
+
+class ExerciseStats(BaseModel):
+    exercise_id: int
+    exercise_name: str
+    buckets: List[ExerciseStatsBucket]
+
+
+class UserStats(BaseModel):
+    period: StatsPeriod
+    exercises: List[ExerciseStats]
@@ -1,8 +1,19 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from datetime import datetime
 from ..models.base import Gender, ActivityLevel, Goal
 
 
+def _check_timezone(value: str | None) -> str | None:
+    if value is None:
+        return value
+    try:
+        ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {value}")
+    return value
+
+
 class PasswordChange(BaseModel):
     current_password: str = Field(min_length=8, description="Current password")
     new_password: str = Field(
@@ -23,6 +34,9 @@ class UserCreate(BaseModel):
     body_fat_percentage: float | None = None
     activity_level: ActivityLevel | None = None
     goal: Goal | None = None
+    timezone: str = "UTC"
+
+    _validate_timezone = field_validator("timezone")(_check_timezone)
 
 
 class UserUpdate(BaseModel):
@@ -35,6 +49,9 @@ class UserUpdate(BaseModel):
     body_fat_percentage: float | None = None
     activity_level: ActivityLevel | None = None
     goal: Goal | None = None
+    timezone: str | None = None
+
+    _validate_timezone = field_validator("timezone")(_check_timezone)
 
 
 class UserOut(BaseModel):
@@ -48,6 +65,7 @@ class UserOut(BaseModel):
     body_fat_percentage: float | None = None
     activity_level: ActivityLevel | None = None
     goal: Goal | None = None
+    timezone: str = "UTC"
     created_at: datetime
     updated_at: datetime
 
@@ -57,7 +75,8 @@ class UserOut(BaseModel):
 
 class UserList(BaseModel):
     users: list[UserOut]
-    total: int
+    total: int | None = None
+    next_cursor: str | None = None
 
 
 class TokenData(BaseModel):
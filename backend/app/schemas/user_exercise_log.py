@@ -1,7 +1,7 @@
 from pydantic import BaseModel
-from typing import Optional, List
-from datetime import datetime
-from app.models.base import UserExerciseLog, User, Exercise, Workout  
+from typing import Optional, List, Dict
+from datetime import datetime, date
+from app.schemas.exercises import ExerciseOut
 
 class UserExerciseLogCreate(BaseModel):
     exercise_id: int  
@@ -24,12 +24,16 @@ class UserExerciseLogUpdate(BaseModel):
     volume: Optional[float] = None
     notes: Optional[str] = None
 
-class UserExerciseLogOut(BaseModel):
+class AddLogsToWorkout(BaseModel):  # Body batch from localStorage
+    logs: List[UserExerciseLogCreate]  # Array logs à push
+
+class UserExerciseLogBase(BaseModel):  # Colonnes du log seules, sans relations
     id: int
     user_id: int
     exercise_id: int
     workout_id: Optional[int] = None
     date: datetime
+    training_date: date
     set_number: int
     reps: int
     weight: Optional[float] = None
@@ -37,15 +41,36 @@ class UserExerciseLogOut(BaseModel):
     duration_seconds: Optional[int] = None
     distance_m: Optional[float] = None
     volume: Optional[float] = None
-    notes: Optional[str] = None
     created_at: datetime
-    user: User  
-    exercise: Exercise  
-    workout: Optional[Workout] = None  
 
     class Config:
         from_attributes = True
-        arbitrary_types_allowed = True  # Pour relations
 
-class AddLogsToWorkout(BaseModel):  # Body batch from localStorage
-    logs: List[UserExerciseLogCreate]  # Array logs à push
\ No newline at end of file
+class UserExerciseLogFlat(UserExerciseLogBase):  # Projection plate, champs joints dans la même requête
+    exercise_name: str
+    muscle_group: Optional[str] = None
+    is_cardio: bool = False
+    workout_name: Optional[str] = None
+
+class WorkoutRef(BaseModel):
+    id: int
+    name: str
+    date: datetime
+    day_of_week: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+class UserExerciseLogExpanded(BaseModel):  # ?expand=exercise,workout : relations chargées une seule fois
+    logs: List[UserExerciseLogBase]
+    exercises: Dict[int, ExerciseOut] = {}
+    workouts: Dict[int, WorkoutRef] = {}
+    next_cursor: Optional[str] = None
+
+class TrainingCalendar(BaseModel):
+    start: date
+    end: date
+    days: List[date]
+
+class TrainingStreak(BaseModel):
+    weeks: int
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import Optional, List
 from app.models.base import WorkoutExercise, Workout, Exercise  
+from app.schemas.exercises import ExerciseOut
 
 class WorkoutExerciseCreate(BaseModel):
     exercise_id: int  # FK exercise
@@ -10,6 +11,9 @@ class WorkoutExerciseCreate(BaseModel):
     rest_seconds: Optional[int] = None
     notes: Optional[str] = None
 
+class WorkoutExercisePlan(WorkoutExerciseCreate):  # Ligne du plan envoyé par PUT /workouts/{id}
+    id: Optional[int] = None  # ligne existante à conserver ; sinon appariée par exercise_id
+
 class WorkoutExerciseUpdate(BaseModel):
     planned_sets: Optional[int] = None
     planned_reps: Optional[int] = None
@@ -26,6 +30,7 @@ class WorkoutExerciseOut(BaseModel):
     planned_weight: Optional[float]
     rest_seconds: Optional[int]
     notes: Optional[str]
+    position: int = 0
     workout: Workout  
     exercise: Exercise  
 
@@ -33,5 +38,20 @@ class WorkoutExerciseOut(BaseModel):
         from_attributes = True
         arbitrary_types_allowed = True 
 
+class WorkoutExerciseDetail(BaseModel):  # Sans back-reference vers le workout parent
+    id: int
+    workout_id: int
+    exercise_id: int
+    planned_sets: Optional[int] = None
+    planned_reps: Optional[int] = None
+    planned_weight: Optional[float] = None
+    rest_seconds: Optional[int] = None
+    notes: Optional[str] = None
+    position: int = 0
+    exercise: ExerciseOut
+
+    class Config:
+        from_attributes = True
+
 class AddExercisesToWorkout(BaseModel):  
     exercises: List[WorkoutExerciseCreate]  
\ No newline at end of file
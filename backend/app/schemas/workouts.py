@@ -3,7 +3,7 @@ from typing import Optional, List
 from datetime import datetime
 from app.models.base import Workout, WorkoutExercise, Exercise
 from app.schemas.user import UserOut
-from app.schemas.workout_exercises import WorkoutExerciseOut, WorkoutExerciseCreate
+from app.schemas.workout_exercises import WorkoutExerciseOut, WorkoutExerciseCreate, WorkoutExerciseDetail, WorkoutExercisePlan
 
 class WorkoutCreate(BaseModel):
     name: str
@@ -18,7 +18,7 @@ class WorkoutUpdate(BaseModel):
     notes: Optional[str] = None
     day_of_week: Optional[int] = None
 
-    exercises: Optional[List[WorkoutExerciseCreate]] = None
+    exercises: Optional[List[WorkoutExercisePlan]] = None
 
 
 class WorkoutOut(BaseModel):
@@ -35,6 +35,27 @@ class WorkoutOut(BaseModel):
         from_attributes = True
         arbitrary_types_allowed = True
 
+class WorkoutDetail(BaseModel):  # Workout + exercices chargés en lot, sans user ni références circulaires
+    id: int
+    name: str
+    date: datetime
+    notes: Optional[str] = None
+    day_of_week: Optional[int] = None
+    user_id: Optional[int] = None  # None : template partagé
+    template_key: Optional[str] = None
+    template_id: Optional[int] = None  # copie modifiée de ce template
+    workout_exercises: List[WorkoutExerciseDetail]
+
+    class Config:
+        from_attributes = True
+
+class WorkoutSummary(BaseModel):  # Version légère pour le dashboard : pas d'exercices détaillés
+    id: int
+    name: str
+    day_of_week: Optional[int] = None
+    exercise_count: int = 0
+
 class WorkoutList(BaseModel):
-    workouts: List[WorkoutOut]
-    total: int
\ No newline at end of file
+    workouts: List[WorkoutDetail]
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
\ No newline at end of file
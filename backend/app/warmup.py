@@ -0,0 +1,99 @@
+import logging
+import time
+from typing import Union, get_args, get_origin
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from sqlmodel import Session
+from app.database.config import settings
+from app.database.db import engine, async_engine
+from app.routers.responses import _adapter
+from app.crud.exercises import get_catalog
+from app.crud.workout_templates import get_templates
+
+# Préchauffage avant de prendre du trafic, pour que les premières requêtes ne paient pas
+# la construction des TypeAdapter, le chargement des snapshots ni l'ouverture des connexions.
+# En production (gunicorn, app préchargée) warm_shared() tourne dans le master avant le fork :
+# les workers héritent des snapshots déjà construits ; chacun ouvre ensuite son propre pool.
+
+logger = logging.getLogger(__name__)
+
+
+def warm_schemas(app: FastAPI) -> int:
+    # Les routes de liste sérialisent via json_response() avec leur response_model,
+    # ou un membre de l'Union quand la route a plusieurs formes de réponse
+    schemas = set()
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.response_model is not None:
+            model = route.response_model
+            schemas.update(get_args(model) if get_origin(model) is Union else (model,))
+    for schema in schemas:
+        _adapter(schema)
+    return len(schemas)
+
+
+def warm_snapshots() -> None:
+    with Session(engine) as session:
+        get_catalog(session)
+        get_templates(session)
+
+
+def warm_pool(connections: int) -> None:
+    # Connexions tenues en même temps : le pool en ouvre `connections` distinctes
+    held = []
+    try:
+        for _ in range(connections):
+            held.append(engine.connect())
+    finally:
+        for conn in held:
+            conn.close()
+
+
+async def warm_async_pool(connections: int) -> None:
+    held = []
+    try:
+        for _ in range(connections):
+            held.append(await async_engine.connect())
+    finally:
+        for conn in held:
+            await conn.close()
+
+
+def warm_shared(app: FastAPI) -> None:
+    """Partie commune à tous les workers ; ne laisse aucune connexion ouverte (fork)."""
+    start = time.perf_counter()
+    schemas = warm_schemas(app)
+    try:
+        warm_snapshots()
+    except Exception as e:
+        logger.warning(f"Snapshot warmup failed, will load on first request: {e}")
+    finally:
+        engine.dispose()
+    logger.info(f"Warmed {schemas} response schemas and catalog snapshots in {time.perf_counter() - start:.2f}s")
+
+
+def warm_worker(app: FastAPI) -> None:
+    # Déjà fait dans le master en production : les caches hérités rendent ces appels quasi gratuits
+    warm_schemas(app)
+    try:
+        warm_snapshots()
+        warm_pool(settings.DB_POOL_SIZE)
+    except Exception as e:
+        logger.warning(f"Worker warmup failed, continuing cold: {e}")
+
+
+async def warm_worker_async() -> None:
+    if async_engine is None:
+        return
+    try:
+        await warm_async_pool(settings.DB_POOL_SIZE)
+    except Exception as e:
+        logger.warning(f"Async pool warmup failed, continuing cold: {e}")
+
+
+def shutdown() -> None:
+    engine.dispose()
+
+
+async def shutdown_async() -> None:
+    if async_engine is not None:
+        await async_engine.dispose()
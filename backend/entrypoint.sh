@@ -10,17 +10,15 @@ which uvicorn
 echo "--- End Checks ---"
 
 echo "Waiting for postgres..."
-while ! nc -z db 5432; do
+while ! nc -z "${POSTGRES_HOST:-db}" "${POSTGRES_PORT:-5432}"; do
   sleep 1
 done
 echo "PostgreSQL started"
 
-echo "Running database migrations..."
-alembic upgrade head
-
-echo "Seeding database..."
-python /backend/seed.py
+echo "Preparing database (migrations + seed)..."
+# Une seule réplique migre/seede (verrou Postgres) ; rien à faire si la base est à jour
+python -m app.database.startup
 
 echo "Starting server..."
-# Fixed: Use 'main:app' to match your flat structure; --reload for dev
-uvicorn main:app --host 0.0.0.0 --port 8000 --reload
\ No newline at end of file
+# uvicorn --reload (SERVER_MODE=dev) ou gunicorn + workers uvicorn (SERVER_MODE=production)
+exec python /backend/server.py
\ No newline at end of file
@@ -0,0 +1,45 @@
+# Configuration gunicorn du mode production (SERVER_MODE=production, lancé par server.py)
+import logging
+import math
+import os
+from pathlib import Path
+from app.database.config import settings
+
+logger = logging.getLogger("gunicorn.error")
+
+
+def cpu_count() -> int:
+    # Quota CPU du container (cgroup v2) s'il y en a un : os.cpu_count() voit ceux de l'hôte
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+
+
+bind = f"0.0.0.0:{settings.WEB_PORT}"
+# Workers asyncio : un par CPU suffit, le threadpool de chaque worker porte les routes sync
+workers = settings.WEB_WORKERS or cpu_count()
+worker_class = "uvicorn_worker.UvicornWorker"
+# L'app est importée une fois dans le master puis forkée : démarrage des workers rapide
+# et mémoire partagée (copy-on-write) pour les modules et les snapshots préchauffés
+preload_app = True
+graceful_timeout = settings.WEB_GRACEFUL_TIMEOUT
+keepalive = settings.WEB_KEEPALIVE
+
+
+def when_ready(server):
+    # Master, app préchargée, avant le fork des workers
+    from main import app
+    from app import warmup
+    warmup.warm_shared(app)
+    per_worker = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    logger.info(f"{workers} workers, up to {workers * per_worker} DB connections ({per_worker} per worker)")
+
+
+def post_fork(server, worker):
+    # Jamais de socket Postgres partagé entre process : le worker repart d'un pool vide
+    from app.database.db import engine
+    engine.dispose(close=False)
@@ -1,14 +1,20 @@
 import sys
 import os
 import logging  # Ajoute pour debug logs
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware 
 from app.database.config import settings
+from app.crud import passwords
+from app import warmup
+from app import metrics
+from app.database.db import engine, async_engine
 from app.routers.users import router as users_router
 from app.routers.exercises import router as exercises_router
 from app.routers.workouts import router as workouts_router
 from app.routers import logs as logs_router
 from app.routers import dashboard as dashboard_router
+from app.routers import system as system_router
 
 # Setup logging basique (sort dans Uvicorn logs)
 logging.basicConfig(level=logging.INFO)
@@ -36,6 +42,30 @@ app.add_middleware(
     expose_headers=["*"],  # Bonus : Expose headers custom si besoin
 )
 
+# Latence, statuts et requêtes SQL par route, lus par Prometheus sur /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+    metrics.track_sql(engine)
+    if async_engine is not None:
+        metrics.track_sql(async_engine.sync_engine)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def read_metrics():
+        return Response(metrics.metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+# Pool de hachage saturé : rejet immédiat plutôt que d'empiler les requêtes
+@app.exception_handler(passwords.HashingBusyError)
+def hashing_busy_handler(request: Request, exc: passwords.HashingBusyError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+app.add_event_handler("shutdown", passwords.shutdown)
+
+# Pool de connexions et caches chauds avant la première requête ; pool fermé proprement à l'arrêt
+app.add_event_handler("startup", lambda: warmup.warm_worker(app))
+app.add_event_handler("startup", warmup.warm_worker_async)
+app.add_event_handler("shutdown", warmup.shutdown)
+app.add_event_handler("shutdown", warmup.shutdown_async)
+
 # --------------------------------------------------------------------------
 
 @app.get("/api")
@@ -55,4 +85,5 @@ app.include_router(users_router, prefix="/api/users", tags=["users"])
 app.include_router(exercises_router, prefix="/api/exercises", tags=["exercises"])
 app.include_router(workouts_router, prefix="/api/workouts", tags=["workouts"])
 app.include_router(logs_router.router, prefix="/api/logs", tags=["logs"])
-app.include_router(dashboard_router.router, prefix="/api/dashboard", tags=["dashboard"])
\ No newline at end of file
+app.include_router(dashboard_router.router, prefix="/api/dashboard", tags=["dashboard"])
+app.include_router(system_router.router, prefix="/api/system", tags=["system"])
\ No newline at end of file
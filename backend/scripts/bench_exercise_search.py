@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Compare la recherche d'exercices historique (unaccent(name) ILIKE '%q%' en base)
+avec l'index trigrammes en mémoire du snapshot du catalogue.
+
+Simule une frappe lettre par lettre (comme stores/exercise.js) sur quelques requêtes
+et affiche la latence par frappe (moyenne, p95) pour chaque méthode.
+
+    python scripts/bench_exercise_search.py [--rounds 50]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+from app.database.db import engine
+from app.models.base import Exercise
+from app.crud.exercises import get_catalog, get_exercise_by_name
+
+QUERIES = ["bench press", "developpe", "squat", "curl", "pull up", "bnech", "deadlfit"]
+
+
+def keystrokes(query: str):
+    return [query[:i] for i in range(1, len(query) + 1)]
+
+
+def ilike_search(session: Session, name: str):
+    return session.exec(
+        select(Exercise).where(func.unaccent(Exercise.name).ilike(f"%{name}%"))
+    ).all()
+
+
+def measure(fn, rounds: int):
+    timings = []
+    for _ in range(rounds):
+        for query in QUERIES:
+            for prefix in keystrokes(query):
+                start = time.perf_counter()
+                fn(prefix)
+                timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.mean(timings), timings[int(len(timings) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark exercise search")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        get_catalog(session)  # construit le snapshot hors mesure
+        results = {
+            "ILIKE (db)": measure(lambda q: ilike_search(session, q), args.rounds),
+            "trigram (memory)": measure(lambda q: get_exercise_by_name(q, session), args.rounds),
+        }
+        for query in QUERIES:
+            print(f"{query!r:14} -> {[e.name for e in get_exercise_by_name(query, session, 3)]}")
+
+    print()
+    for label, (mean, p95) in results.items():
+        print(f"{label:18} mean {mean:.3f} ms   p95 {p95:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
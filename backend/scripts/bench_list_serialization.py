@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Coût CPU de la sérialisation d'une page de GET /api/workouts/, sans base de données :
+
+- "response_model" : chemin historique, la route renvoie un dict de modèles et FastAPI
+  les revalide contre response_model, puis jsonable_encoder + json.dumps (JSONResponse) ;
+- "dump_json" : la route renvoie json_response(), les modèles déjà validés sont
+  sérialisés une seule fois par pydantic-core.
+
+Les pages sont synthétiques (workouts de --exercises exercices chacun).
+
+    python scripts/bench_list_serialization.py [--pages 100 500 1000] [--exercises 8] [--rounds 20]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from main import app
+from app.crud.pagination import next_cursor
+from app.routers.responses import json_response
+from app.schemas.exercises import ExerciseOut
+from app.schemas.workout_exercises import WorkoutExerciseDetail
+from app.schemas.workouts import WorkoutDetail, WorkoutList
+
+
+def make_page(size: int, exercises: int):
+    now = datetime(2026, 1, 1, 12, 0)
+    catalog = [
+        ExerciseOut(id=i, name=f"Exercise {i}", description="x" * 80, muscle_group="Chest",
+                    equipement="Barbell", difficulty="Intermediate", default_rest_seconds=90, created_at=now)
+        for i in range(1, exercises + 1)
+    ]
+    return [
+        WorkoutDetail(
+            id=w, name=f"Workout {w}", date=now, notes=None, day_of_week=w % 7 + 1, user_id=1,
+            workout_exercises=[
+                WorkoutExerciseDetail(id=w * 100 + i, workout_id=w, exercise_id=e.id, planned_sets=4,
+                                      planned_reps=8, planned_weight=60.0, rest_seconds=90, exercise=e)
+                for i, e in enumerate(catalog)
+            ],
+        )
+        for w in range(1, size + 1)
+    ]
+
+
+def response_field():
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.path == "/api/workouts/" and "GET" in route.methods:
+            return route.secure_cloned_response_field
+    raise RuntimeError("GET /api/workouts/ not found")
+
+
+async def legacy(field, workouts, limit) -> bytes:
+    content = {"workouts": workouts, "total": len(workouts), "next_cursor": next_cursor(workouts, limit, lambda w: (w.id,))}
+    return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+
+async def fast(field, workouts, limit) -> bytes:
+    page = WorkoutList.model_construct(workouts=workouts, total=len(workouts), next_cursor=next_cursor(workouts, limit, lambda w: (w.id,)))
+    return json_response(page, WorkoutList).body
+
+
+async def measure(fn, field, workouts, rounds: int):
+    await fn(field, workouts, len(workouts))  # chauffe (schémas, TypeAdapter)
+    timings = []
+    for _ in range(rounds):
+        start = time.process_time()
+        body = await fn(field, workouts, len(workouts))
+        timings.append((time.process_time() - start) * 1000)
+    return statistics.median(timings), len(body)
+
+
+async def run(args):
+    field = response_field()
+    print(f"{'page':>6} {'response_model':>16} {'dump_json':>12} {'speedup':>8} {'body':>10}")
+    for size in args.pages:
+        workouts = make_page(size, args.exercises)
+        legacy_ms, legacy_bytes = await measure(legacy, field, workouts, args.rounds)
+        fast_ms, fast_bytes = await measure(fast, field, workouts, args.rounds)
+        print(f"{size:>6} {legacy_ms:>13.2f} ms {fast_ms:>9.2f} ms {legacy_ms / fast_ms:>7.1f}x {fast_bytes / 1024:>7.0f} KB")
+        if abs(legacy_bytes - fast_bytes) > legacy_bytes * 0.05:
+            print(f"  ⚠️ body size differs: {legacy_bytes} vs {fast_bytes} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list response serialization")
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--exercises", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=20)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark de charge des endpoints chauds, à lancer contre un serveur démarré
+une fois avec la pile sync (DB_ASYNC=false) puis avec la pile async (DB_ASYNC=true) :
+
+    python scripts/bench_load.py --url http://localhost:8000 \\
+        --email user@example.com --password secret --concurrency 200 --requests 5000
+
+Chaque "requête" tire au sort un endpoint (dashboard, logs, workouts, today) ; le
+login est mesuré à part car il est dominé par argon2. Affiche le débit et les
+latences p50/p95/p99 par endpoint et au total.
+
+Nécessite httpx (pip install httpx), qui n'est pas une dépendance de l'API.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str):
+    response = await client.post("/api/users/login", data={"username": email, "password": password})
+    response.raise_for_status()
+    body = response.json()
+    return body["access_token"], body["user"]["id"]
+
+
+async def load(args):
+    """Lance la charge ; renvoie (durée en s, latences par endpoint, erreurs, latences du login)."""
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        token, user_id = await login(client, args.email, args.password)
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        endpoints = {
+            "dashboard": f"/api/dashboard/{user_id}",
+            "logs": f"/api/users/{user_id}/logs?limit=50",
+            "workouts": f"/api/workouts/?user_id={user_id}",
+            "today": f"/api/workouts/today/?user_id={user_id}",
+        }
+        timings = defaultdict(list)
+        errors = defaultdict(int)
+        queue = asyncio.Queue()
+        for _ in range(args.requests):
+            queue.put_nowait(random.choice(list(endpoints)))
+
+        async def worker():
+            while not queue.empty():
+                name = queue.get_nowait()
+                start = time.perf_counter()
+                try:
+                    response = await client.get(endpoints[name])
+                    if response.status_code >= 400:
+                        errors[name] += 1
+                except httpx.HTTPError:
+                    errors[name] += 1
+                timings[name].append((time.perf_counter() - start) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+        login_timings = []
+        for _ in range(args.logins):
+            start = time.perf_counter()
+            await login(client, args.email, args.password)
+            login_timings.append((time.perf_counter() - start) * 1000)
+    return elapsed, timings, errors, login_timings
+
+
+async def run(args):
+    elapsed, timings, errors, login_timings = await load(args)
+    everything = [t for values in timings.values() for t in values]
+    print(f"{args.requests} requests, concurrency {args.concurrency}: {args.requests / elapsed:.0f} req/s")
+    print(f"{'endpoint':10} {'count':>6} {'errors':>6} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8}  (ms)")
+    for name, values in sorted(timings.items()) + [("total", everything), ("login", login_timings)]:
+        if not values:
+            continue
+        print(
+            f"{name:10} {len(values):6} {errors.get(name, 0):6} {statistics.mean(values):8.1f} "
+            f"{percentile(values, 0.5):8.1f} {percentile(values, 0.95):8.1f} {percentile(values, 0.99):8.1f}"
+        )
+    return 1 if sum(errors.values()) else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load benchmark for the hot endpoints")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--logins", type=int, default=20)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
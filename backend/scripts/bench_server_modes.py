@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Compare les modes de lancement du serveur (SERVER_MODE) sous la même charge que
+bench_load.py : "dev" (uvicorn --reload, un process) et "production" (gunicorn,
+app préchargée, un worker uvicorn par CPU ou WEB_WORKERS).
+
+Chaque mode est démarré via server.py sur --port, mesuré, puis arrêté par SIGTERM :
+
+- démarrage : du lancement à la première réponse 200 de /api/system/ready ;
+- débit, p50/p99 : bench_load.load() sur les endpoints chauds ;
+- arrêt : du SIGTERM à la libération du port (requêtes en cours terminées).
+
+    python scripts/bench_server_modes.py --email user@example.com --password secret \\
+        [--modes dev production] [--port 8100] [--concurrency 200] [--requests 5000] [--server-log /tmp/server]
+
+La base doit être préparée (python -m app.database.startup) et le user exister.
+Nécessite httpx, comme bench_load.py.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_load import load, percentile  # noqa: E402
+
+
+def wait_ready(url: str, process: subprocess.Popen, timeout: float = 60.0) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{url}/api/system/ready", timeout=1).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    raise RuntimeError("server not ready in time")
+
+
+def port_open(port: int) -> bool:
+    with socket.socket() as sock:
+        return sock.connect_ex(("localhost", port)) == 0
+
+
+def stop(process: subprocess.Popen, port: int) -> float:
+    # Tout le groupe : en dev, le process servi par le reloader continue de répondre
+    # quelques instants après la sortie du reloader, le mode suivant le trouverait sur le port
+    start = time.perf_counter()
+    os.killpg(process.pid, signal.SIGTERM)
+    try:
+        process.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+    while port_open(port) and time.perf_counter() - start < 60:
+        time.sleep(0.05)
+    return time.perf_counter() - start
+
+
+def bench_mode(mode: str, args) -> dict:
+    env = {**os.environ, "SERVER_MODE": mode, "WEB_PORT": str(args.port)}
+    output = open(f"{args.server_log}.{mode}", "w") if args.server_log else subprocess.DEVNULL
+    process = subprocess.Popen(
+        [sys.executable, str(BACKEND_DIR / "server.py")],
+        cwd=BACKEND_DIR, env=env, stdout=output, stderr=subprocess.STDOUT, start_new_session=True,
+    )
+    try:
+        startup = wait_ready(args.url, process)
+        elapsed, timings, errors, _ = asyncio.run(load(args))
+    finally:
+        shutdown = stop(process, args.port)
+        if args.server_log:
+            output.close()
+    everything = [t for values in timings.values() for t in values]
+    return {
+        "mode": mode,
+        "startup": startup,
+        "rps": args.requests / elapsed,
+        "mean": statistics.mean(everything),
+        "p50": percentile(everything, 0.5),
+        "p99": percentile(everything, 0.99),
+        "errors": sum(errors.values()),
+        "shutdown": shutdown,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dev vs production server modes")
+    parser.add_argument("--modes", nargs="+", default=["dev", "production"])
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--server-log", help="garde la sortie du serveur dans <chemin>.<mode>")
+    args = parser.parse_args()
+    args.url = f"http://localhost:{args.port}"
+    args.logins = 0
+
+    print(f"{'mode':11} {'startup':>8} {'req/s':>7} {'mean':>8} {'p50':>8} {'p99':>8} {'errors':>6} {'shutdown':>9}")
+    for mode in args.modes:
+        r = bench_mode(mode, args)
+        print(
+            f"{r['mode']:11} {r['startup']:7.2f}s {r['rps']:7.0f} {r['mean']:6.1f}ms {r['p50']:6.1f}ms "
+            f"{r['p99']:6.1f}ms {r['errors']:6} {r['shutdown']:8.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Vérifie que les requêtes de app/crud utilisent les index sur les grosses tables.
+
+Le script seede des données synthétiques dans une transaction (annulée à la fin),
+exécute les fonctions CRUD de lecture en capturant le SQL émis, puis lance un
+EXPLAIN sur chaque requête avec enable_seqscan = off : s'il reste un Seq Scan sur
+une des tables surveillées, c'est qu'aucun index ne couvre le chemin d'accès.
+
+    python scripts/check_query_plans.py [--users 50] [--weeks 52]
+
+Code de sortie 1 si une régression est détectée (utilisable en CI).
+"""
+import argparse
+import json
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import event, text
+from sqlmodel import Session
+from app.database.db import engine
+from app.crud import dashboard, personal_records, stats, user_exercise_log, workouts
+from app.crud.pagination import encode_cursor
+from app.schemas.stats import StatsPeriod
+
+LARGE_TABLES = {"user_exercise_logs", "workouts", "workout_exercises", "personal_records"}
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+SEED_SQL = [
+    """
+    INSERT INTO users (username, email, hashed_password, gender, birthdate)
+    SELECT 'plan_check_' || g, 'plan_check_' || g || '@example.com', 'x', 'male', '1990-01-01'
+    FROM generate_series(1, :users) g
+    """,
+    """
+    INSERT INTO workouts (user_id, name, day_of_week)
+    SELECT u.id, 'Plan check ' || d, d
+    FROM users u CROSS JOIN generate_series(1, 7) d
+    WHERE u.username LIKE 'plan_check_%'
+    """,
+    """
+    INSERT INTO workout_exercises (workout_id, exercise_id, planned_sets, planned_reps)
+    SELECT w.id, e.id, 3, 10
+    FROM workouts w
+    JOIN users u ON u.id = w.user_id AND u.username LIKE 'plan_check_%'
+    CROSS JOIN (SELECT id FROM exercises ORDER BY id LIMIT 6) e
+    """,
+    """
+    INSERT INTO user_exercise_logs (user_id, exercise_id, workout_id, date, training_date, set_number, reps, weight, volume)
+    SELECT w.user_id, we.exercise_id, w.id, now() - make_interval(weeks => g, days => w.day_of_week),
+           (now() - make_interval(weeks => g, days => w.day_of_week))::date,
+           s, 8, 60 + (g % 40), 8 * (60 + (g % 40))
+    FROM workouts w
+    JOIN users u ON u.id = w.user_id AND u.username LIKE 'plan_check_%'
+    JOIN workout_exercises we ON we.workout_id = w.id
+    CROSS JOIN generate_series(0, :weeks) g
+    CROSS JOIN generate_series(1, 3) s
+    """,
+]
+
+
+def seed(connection, users: int, weeks: int) -> int:
+    if not connection.execute(text("SELECT count(*) FROM exercises")).scalar():
+        raise SystemExit("❌ Exercise catalog is empty, run the migrations/seed first")
+    for sql in SEED_SQL:
+        connection.execute(text(sql), {"users": users, "weeks": weeks})
+    for table in LARGE_TABLES | {"users", "exercises"}:
+        connection.execute(text(f"ANALYZE {table}"))
+    return connection.execute(
+        text("SELECT id FROM users WHERE username LIKE 'plan_check_%' ORDER BY id LIMIT 1")
+    ).scalar()
+
+
+def run_crud_queries(session: Session, user_id: int) -> None:
+    """Appelle les chemins CRUD chauds ; le SQL émis est capturé par l'appelant."""
+    page, _ = workouts.get_workouts(session, 0, 20, user_id)
+    workouts.get_workouts(session, 0, 20, user_id, cursor=encode_cursor(page[0].id), with_total=False)
+    workout = page[0]
+    exercise_id = workout.workout_exercises[0].exercise_id
+
+    workouts.get_workout(workout.id, session)
+    workouts.get_workout_for_day(user_id, date.today().isoweekday(), session)
+    first_page = user_exercise_log.get_user_exercise_logs(session, user_id, limit=50)
+    user_exercise_log.get_user_exercise_logs(
+        session, user_id, limit=50, cursor=user_exercise_log.log_cursor(first_page, 50)
+    )
+    user_exercise_log.get_user_exercise_logs(session, user_id, exercise_id=exercise_id)
+    user_exercise_log.get_user_exercise_logs(session, user_id, workout_id=workout.id)
+    user_exercise_log.get_user_exercise_logs_expanded(session, user_id, {"exercise", "workout"})
+    user_exercise_log.get_logs_for_date(user_id, date.today() - timedelta(days=1), session)
+    user_exercise_log.get_training_days(session, user_id, date.today() - timedelta(days=34), date.today())
+    user_exercise_log.get_weekly_streak(session, user_id, date.today())
+    dashboard.get_dashboard_data(user_id, session)
+    stats.get_user_stats(session, user_id, StatsPeriod.WEEK)
+    personal_records.refresh_exercise_records(session, user_id, exercise_id)
+    personal_records.get_personal_records(session, user_id)
+
+
+def seq_scans(plan: dict):
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in LARGE_TABLES:
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from seq_scans(child)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN regression check for app/crud")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--weeks", type=int, default=52)
+    args = parser.parse_args()
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(EXPLAINABLE):
+            captured.append((statement, parameters))
+
+    failures = 0
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            user_id = seed(connection, args.users, args.weeks)
+
+            event.listen(connection, "before_cursor_execute", capture)
+            with Session(bind=connection, join_transaction_mode="create_savepoint") as session:
+                run_crud_queries(session, user_id)
+            event.remove(connection, "before_cursor_execute", capture)
+
+            connection.execute(text("SET LOCAL enable_seqscan = off"))
+            for statement, parameters in captured:
+                plan = connection.exec_driver_sql(
+                    "EXPLAIN (FORMAT JSON) " + statement, parameters
+                ).scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                tables = sorted(set(seq_scans(plan[0]["Plan"])))
+                if tables:
+                    failures += 1
+                    print(f"❌ Seq Scan on {', '.join(tables)}:\n{statement}\n")
+        finally:
+            transaction.rollback()
+
+    print(f"{len(captured)} queries checked, {failures} regression(s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Importe un historique de séries (CSV ou NDJSON) pour un utilisateur, par morceaux.
+
+    python scripts/import_logs.py --user 42 historique.csv
+    python scripts/import_logs.py --user 42 export.ndjson --chunk-size 2000
+
+Colonnes : date, exercise (nom) ou exercise_id, set_number, reps, puis optionnellement
+weight, rest_seconds, duration_seconds, distance_m, volume. Relancer la même commande
+après une interruption reprend au premier morceau non importé.
+"""
+import argparse
+import hashlib
+import sys
+from itertools import islice
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlmodel import Session
+from app.database.db import engine
+from app.crud.log_import import IMPORT_CHUNK_SIZE, IMPORT_MAX_ROWS, read_records, import_log_chunk
+
+
+def default_import_id(path: Path, user_id: int, chunk_size: int) -> str:
+    # Même fichier + même découpage = même import : les morceaux déjà chargés sont sautés
+    digest = hashlib.sha1(f"{user_id}:{chunk_size}:".encode())
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return f"cli-{digest.hexdigest()[:32]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import of exercise logs")
+    parser.add_argument("file", type=Path)
+    parser.add_argument("--user", type=int, required=True)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default=None, help="Déduit de l'extension par défaut")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    parser.add_argument("--import-id", default=None)
+    args = parser.parse_args()
+
+    if not 1 <= args.chunk_size <= IMPORT_MAX_ROWS:
+        parser.error(f"--chunk-size must be between 1 and {IMPORT_MAX_ROWS}")
+    fmt = args.format or args.file.suffix.lstrip(".").lower()
+    import_id = args.import_id or default_import_id(args.file, args.user, args.chunk_size)
+
+    inserted = skipped = errors = 0
+    with args.file.open(encoding="utf-8-sig", newline="") as f, Session(engine) as session:
+        records = read_records(f, fmt)
+        chunk = 0
+        while True:
+            batch = list(islice(records, args.chunk_size))
+            if not batch:
+                break
+            result = import_log_chunk(session, args.user, import_id, chunk, batch)
+            if result.skipped:
+                skipped += 1
+            inserted += result.inserted
+            errors += len(result.errors)
+            for error in result.errors:
+                print(f"  line {error.line}: {error.error}", file=sys.stderr)
+            chunk += 1
+
+    print(f"✅ Import {import_id}: {inserted} logs inserted, {errors} rejected, {skipped}/{chunk} chunks already imported")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Reconstruit la table personal_records à partir de user_exercise_logs.
+
+    python scripts/rebuild_personal_records.py            # tous les utilisateurs
+    python scripts/rebuild_personal_records.py --user 42  # un seul utilisateur
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlmodel import Session
+from app.database.db import engine
+from app.crud.personal_records import rebuild_personal_records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill personal_records")
+    parser.add_argument("--user", type=int, default=None, help="Limiter à un utilisateur")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        rebuild_personal_records(session, user_id=args.user)
+    scope = f"user {args.user}" if args.user else "all users"
+    print(f"✅ Personal records rebuilt for {scope}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+# Lance l'API selon SERVER_MODE : uvicorn --reload en dev, gunicorn + workers uvicorn en production.
+# exec : le serveur remplace ce process et reçoit directement SIGTERM (arrêt propre).
+import os
+from pathlib import Path
+from app.database.config import settings
+
+BACKEND_DIR = Path(__file__).resolve().parent
+
+if __name__ == "__main__":
+    if settings.SERVER_MODE == "production":
+        os.execvp("gunicorn", ["gunicorn", "main:app", "--config", str(BACKEND_DIR / "gunicorn.conf.py")])
+    elif settings.SERVER_MODE == "dev":
+        os.execvp("uvicorn", ["uvicorn", "main:app", "--host", "0.0.0.0", "--port", str(settings.WEB_PORT), "--reload"])
+    else:
+        raise SystemExit(f"Invalid SERVER_MODE: {settings.SERVER_MODE}. Allowed: dev, production")
@@ -57,6 +57,7 @@ export const api = {
   createWorkout(workoutPayload) {
     return apiClient.post('/api/workouts/', workoutPayload)
   },
+  // Template partagé : la modification en crée une copie pour le user du token
   updateWorkout(id, updatePayload) {
     return apiClient.put(`/api/workouts/${id}`, updatePayload)
   },
@@ -71,6 +72,10 @@ export const api = {
   searchExercises(query) {
     return apiClient.get(`/api/exercises/search/${query}`)
   },
+  filterExercises(filters = {}) {
+    // filters: { muscle_group: [...], equipement: [...], difficulty: [...], is_cardio }
+    return apiClient.get('/api/exercises/filter', { params: filters, paramsSerializer: { indexes: null } })
+  },
 
   // --- Logs ---
   createLog(userId, logData) {
@@ -92,9 +97,20 @@ export const api = {
     return apiClient.get(`/api/users/${userId}/logs`, { params })
   },
 
+  importLogs(file, importId, chunk = 0, format) {
+    // Un appel = un morceau ; rejouer un morceau déjà importé ne fait rien
+    const form = new FormData()
+    form.append('file', file)
+    return apiClient.post('/api/logs/import', form, { params: { import_id: importId, chunk, format } })
+  },
+
+  fetchUserStats(userId, params = {}) {
+    return apiClient.get(`/api/users/${userId}/stats`, { params })
+  },
+
   //--- Dashboard ---
-  fetchDashboardData(userId) {
-    return apiClient.get(`/api/dashboard/${userId}`)
+  fetchDashboardData(userId, params = {}) {
+    return apiClient.get(`/api/dashboard/${userId}`, { params })
   },
 
   // Live Workout
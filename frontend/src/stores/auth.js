@@ -28,7 +28,9 @@ export const useAuthStore = defineStore('auth', {
 
     async register(userData) {
       try {
-        await api.register(userData)
+        // Fuseau du navigateur : sert à dater les séances dans le jour local de l'utilisateur
+        const timezone = Intl.DateTimeFormat().resolvedOptions().timeZone
+        await api.register({ timezone, ...userData })
 
         return await this.login({ email: userData.email, password: userData.password })
       } catch (error) {
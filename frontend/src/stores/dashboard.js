@@ -11,7 +11,8 @@ export const useDashboardStore = defineStore('dashboard', () => {
     isLoading.value = true
     const authStore = useAuthStore()
     try {
-      const response = await api.fetchDashboardData(authStore.user.id)
+      // La page d'accueil n'affiche que le nom du workout : résumé suffisant
+      const response = await api.fetchDashboardData(authStore.user.id, { summary: true })
       dashboardData.value = response.data
     } catch (error) {
       console.error('Failed to fetch dashboard data:', error)
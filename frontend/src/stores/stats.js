@@ -0,0 +1,24 @@
+import { defineStore } from 'pinia'
+import { ref } from 'vue'
+import { api } from '@/services/api'
+import { useAuthStore } from './auth'
+
+export const useStatsStore = defineStore('stats', () => {
+  const stats = ref(null)
+  const isLoading = ref(false)
+
+  async function fetchStats(period = 'day') {
+    isLoading.value = true
+    const authStore = useAuthStore()
+    try {
+      const response = await api.fetchUserStats(authStore.user.id, { period })
+      stats.value = response.data
+    } catch (error) {
+      console.error('Failed to fetch stats:', error)
+    } finally {
+      isLoading.value = false
+    }
+  }
+
+  return { stats, isLoading, fetchStats }
+})
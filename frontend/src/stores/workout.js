@@ -108,6 +108,7 @@ export const useWorkoutStore = defineStore('workout', () => {
         name: name,
         day_of_week: day_of_week,
         exercises: exercises.map((ex) => ({
+          id: ex.id, // ligne existante : le serveur la met à jour au lieu de la recréer
           exercise_id: ex.exercise.id,
           planned_sets: ex.planned_sets,
           planned_reps: ex.planned_reps,